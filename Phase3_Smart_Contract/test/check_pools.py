@@ -1,11 +1,8 @@
+import os
 from web3 import Web3
 
-# اتصال به Arbitrum Sepolia
-rpc_url = "https://arbitrum-sepolia.infura.io/v3/6cb906401b0b4ab4a53beef2c28ba519"
-web3 = Web3(Web3.HTTPProvider(rpc_url))
-
-if not web3.is_connected():
-    raise Exception("❌ اتصال به شبکه برقرار نشد")
+# اتصال به Arbitrum Sepolia (قابل تغییر با متغیر محیطی)
+rpc_url = os.environ.get("ARBITRUM_SEPOLIA_RPC_URL", "https://arbitrum-sepolia.infura.io/v3/6cb906401b0b4ab4a53beef2c28ba519")
 
 # آدرس‌ها
 factory_address = Web3.to_checksum_address("0x1F98431c8aD98523631AE4a59f267346ea31F984")  # Uniswap V3 Factory
@@ -54,25 +51,45 @@ pool_abi = [
     }
 ]
 
-# ایجاد کانترکت فکتوری
-factory_contract = web3.eth.contract(address=factory_address, abi=factory_abi)
+def main():
+    # اتصال فقط هنگام اجرای مستقیم اسکریپت، نه هنگام import
+    web3 = Web3(Web3.HTTPProvider(rpc_url))
+    if not web3.is_connected():
+        raise Exception("❌ اتصال به شبکه برقرار نشد")
+
+    # ایجاد کانترکت فکتوری
+    factory_contract = web3.eth.contract(address=factory_address, abi=factory_abi)
+
+    # همه خواندن‌ها روی یک بلاک ثابت انجام می‌شوند (snapshot یکسان)
+    block_number = web3.eth.block_number
+
+    # گرفتن آدرس استخر
+    pool_address = factory_contract.functions.getPool(usdc_address, weth_address, fee).call(block_identifier=block_number)
+
+    if pool_address == "0x0000000000000000000000000000000000000000":
+        print("❌ استخر پیدا نشد.")
+    else:
+        print(f"✅ آدرس استخر: {pool_address}")
 
-# گرفتن آدرس استخر
-pool_address = factory_contract.functions.getPool(usdc_address, weth_address, fee).call()
+        # اتصال به کانترکت استخر
+        pool_contract = web3.eth.contract(address=pool_address, abi=pool_abi)
 
-if pool_address == "0x0000000000000000000000000000000000000000":
-    print("❌ استخر پیدا نشد.")
-else:
-    print(f"✅ آدرس استخر: {pool_address}")
+        # گرفتن اطلاعات (slot0 و liquidity در یک درخواست JSON-RPC دسته‌ای)
+        try:
+            with web3.batch_requests() as batch:
+                batch.add(pool_contract.functions.slot0().call(block_identifier=block_number))
+                batch.add(pool_contract.functions.liquidity().call(block_identifier=block_number))
+                slot0, liquidity = batch.execute()
+        except Exception:
+            # Node without JSON-RPC batch support: fall back to one call each
+            slot0 = pool_contract.functions.slot0().call(block_identifier=block_number)
+            liquidity = pool_contract.functions.liquidity().call(block_identifier=block_number)
 
-    # اتصال به کانترکت استخر
-    pool_contract = web3.eth.contract(address=pool_address, abi=pool_abi)
+        print(f"\n🧪 اطلاعات استخر (block {block_number}):")
+        print(f"SqrtPriceX96: {slot0[0]}")
+        print(f"Tick: {slot0[1]}")
+        print(f"Liquidity: {liquidity}")
 
-    # گرفتن اطلاعات
-    slot0 = pool_contract.functions.slot0().call()
-    liquidity = pool_contract.functions.liquidity().call()
 
-    print("\n🧪 اطلاعات استخر:")
-    print(f"SqrtPriceX96: {slot0[0]}")
-    print(f"Tick: {slot0[1]}")
-    print(f"Liquidity: {liquidity}")
+if __name__ == "__main__":
+    main()
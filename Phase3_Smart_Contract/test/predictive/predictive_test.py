@@ -1,16 +1,18 @@
 import os
 import sys
-import json
+import argparse
+import asyncio
+import functools
 import time
 import logging
 import requests
 import math
-import csv
-from datetime import datetime
 from pathlib import Path
 from web3 import Web3
+from web3.exceptions import ContractLogicError, Web3Exception
+from eth_abi.exceptions import DecodingError
 from eth_account import Account
-from decimal import Decimal, getcontext
+from decimal import InvalidOperation
 
 # --- Adjust path imports ---
 # This ensures that the 'Phase3_Smart_Contract' directory is in sys.path
@@ -25,12 +27,11 @@ if str(project_root) not in sys.path:
 import test.utils.web3_utils as web3_utils
 
 
-# Precision for Decimal calculations
-getcontext().prec = 78
-
 try:
-    from test.utils.test_base import LiquidityTestBase
-    from test.utils.web3_utils import send_transaction, get_contract
+    from test.utils.test_base import LiquidityTestBase, queued_logger
+    from test.utils.web3_utils import get_contract, get_pool_address, format_token_amount, wait_for_receipt, json_loads, json_dumps, env_number, build_http_session
+    from test.utils.multicall import aggregate3, erc20_balances, read_slot0_and_call
+    from test.utils.tick_math import price_to_tick_exact
 except ImportError as e:
     # This log might not be visible if the script itself fails on the module import above.
     # The primary error will be the ModuleNotFoundError from the `import test.utils.web3_utils`
@@ -40,63 +41,135 @@ except ImportError as e:
 # --- Constants ---
 MIN_WETH_TO_FUND_CONTRACT = Web3.to_wei(0.02, 'ether')
 MIN_USDC_TO_FUND_CONTRACT = 20 * (10**6) # 20 USDC
-TWO_POW_96 = Decimal(2**96)
-MIN_TICK_CONST = -887272
-MAX_TICK_CONST = 887272
+# updatePredictionAndAdjust(int24) calldata is built by hand: fixed selector + one 32-byte signed word
+ADJUST_SELECTOR = Web3.keccak(text="updatePredictionAndAdjust(int24)")[:4]
+
+# What a JSON-RPC round-trip can raise: web3 errors (RPC error responses, receipt timeouts), reverts,
+# undecodable return data (DecodingError covers InsufficientDataBytes), price arithmetic on bad
+# values, transport errors and web3_utils connection failures. Anything else is a bug and goes to
+# the catch-all in adjust_position_async, which still records the cycle.
+RPC_ERRORS = (Web3Exception, ContractLogicError, DecodingError, InvalidOperation,
+              requests.exceptions.RequestException, TimeoutError, ConnectionError)
 
 # --- Setup Logging ---
-# Configure basicConfig at a higher level or ensure it's only called once.
-# If run as main, this is fine. If imported, could conflict.
-if not logging.getLogger('predictive_test').hasHandlers():
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler("predictive_test.log"), # Log to a file in the execution directory
-            logging.StreamHandler()
-        ]
-    )
-logger = logging.getLogger('predictive_test')
+logger = queued_logger('predictive_test', "predictive_test.log")
+# QUIET=1 drops the per-cycle info chatter before any record is built
+if os.getenv('QUIET') == '1':
+    logger.setLevel(logging.WARNING)
 
 # --- Define path for addresses and results ---
 ADDRESS_FILE_PREDICTIVE = project_root / 'predictiveManager_address.json'
 RESULTS_FILE = project_root / 'position_results_predictive.csv'
+CSV_COLUMNS = (
+    'timestamp', 'contract_type', 'action_taken', 'tx_hash',
+    'predictedPrice_api', 'predictedTick_calculated',
+    'actualPrice_pool', 'sqrtPriceX96_pool', 'currentTick_pool',
+    'targetTickLower_calculated', 'targetTickUpper_calculated',
+    'finalTickLower_contract', 'finalTickUpper_contract', 'liquidity_contract',
+    'gas_used', 'gas_cost_eth', 'error_message'
+)
+# Rows are written through a 64 KiB buffer and flushed to disk every N rows or T seconds, whichever
+# comes first (and at exit); the time bound keeps slow schedules from holding rows back for long
+CSV_FLUSH_EVERY_ROWS = env_number('PREDICTIVE_CSV_FLUSH_EVERY', 10)
+CSV_FLUSH_EVERY_SECONDS = env_number('PREDICTIVE_CSV_FLUSH_SECONDS', 300.0, float)
+_METRICS_TEMPLATE = (
+    ('timestamp', None), ('contract_type', 'Predictive'),
+    ('action_taken', "init"), ('tx_hash', None),
+    ('predictedPrice_api', None), ('predictedTick_calculated', None),
+    ('actualPrice_pool', None), ('sqrtPriceX96_pool', 0), ('currentTick_pool', 0),
+    ('targetTickLower_calculated', 0), ('targetTickUpper_calculated', 0),
+    ('finalTickLower_contract', 0), ('finalTickUpper_contract', 0), ('liquidity_contract', 0),
+    ('gas_used', 0), ('gas_cost_eth', 0.0), ('error_message', "")
+)
 LSTM_API_URL = os.getenv('LSTM_API_URL', 'http://95.216.156.73:5000/predict_price?symbol=ETHUSDT&interval=4h')
+# Ticks the prediction must stay inside the current range to skip the adjustment tx (unset: pool tickSpacing)
+IN_RANGE_BUFFER_TICKS = env_number('PREDICTIVE_IN_RANGE_BUFFER_TICKS', None)
+# After an in-range skip, cycles whose predicted tick is unchanged reuse that position instead of
+# re-reading the chain; every SKIP_RECHECK_CYCLES such repeats the full on-chain check runs again
+SKIP_RECHECK_CYCLES = env_number('PREDICTIVE_SKIP_RECHECK_CYCLES', 10)
+# LSTM responses are reused for LSTM_CACHE_TTL_SECONDS, across runs via a JSON sidecar.
+# LSTM_CACHE_MODE: 'on' (read + write), 'read_only' (never refresh the file), 'off' (always query the API)
+PREDICTION_CACHE_FILE = project_root / '.test_cache' / 'lstm_prediction_cache.json'
+PREDICTION_CACHE_TTL_S = env_number('LSTM_CACHE_TTL_SECONDS', 60.0, float)
+PREDICTION_CACHE_MODE = os.getenv('LSTM_CACHE_MODE', 'on').lower()
+# Adjustment gas limit is learned from past receipts instead of estimated per tx
+GAS_CAP_FILE = project_root / '.test_cache' / 'predictive_gas.json'
+# On local dev nodes the adjustment is dry-run with debug_traceCall first: a revert is caught
+# without spending a tx, and the traced gasUsed (plus headroom) becomes the gas limit
+TRACE_DRY_RUN_CLIENTS = ('anvil', 'hardhat')
+TRACE_GAS_HEADROOM = 1.25
+
+logger.info("Project Root for Predictive Test (from predictive_test.py): %s\nPredictive Address File: %s\nPredictive Results File: %s\nLSTM API URL: %s",
+            project_root, ADDRESS_FILE_PREDICTIVE, RESULTS_FILE, LSTM_API_URL)
+
+
+# --- LSTM Prediction Cache ---
+_http_session = build_http_session() # Keep-alive connection reused across API queries
+_prediction_cache = None # url -> {'timestamp': epoch seconds, 'predicted_price': float}
+
+def _load_prediction_cache() -> dict:
+    global _prediction_cache
+    if _prediction_cache is None:
+        try:
+            _prediction_cache = json_loads(PREDICTION_CACHE_FILE.read_bytes())
+        except (OSError, ValueError):
+            _prediction_cache = {}
+    return _prediction_cache
+
+def get_cached_prediction(url: str) -> float | None:
+    """Predicted price stored for `url` within the TTL, or None (always None when the cache is off)."""
+    if PREDICTION_CACHE_MODE == 'off':
+        return None
+    entry = _load_prediction_cache().get(url)
+    if entry and time.time() - entry['timestamp'] < PREDICTION_CACHE_TTL_S:
+        return entry['predicted_price']
+    return None
+
+def store_prediction(url: str, predicted_price: float):
+    """Record a fresh prediction; persisted to the sidecar file only in 'on' mode."""
+    if PREDICTION_CACHE_MODE != 'on':
+        return
+    _load_prediction_cache()[url] = {'timestamp': time.time(), 'predicted_price': predicted_price}
+    try:
+        PREDICTION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        PREDICTION_CACHE_FILE.write_bytes(json_dumps(_prediction_cache))
+    except OSError as e:
+        logger.warning("Could not write LSTM prediction cache %s: %s", PREDICTION_CACHE_FILE, e)
 
-logger.info(f"Project Root for Predictive Test (from predictive_test.py): {project_root}")
-logger.info(f"Predictive Address File: {ADDRESS_FILE_PREDICTIVE}")
-logger.info(f"Predictive Results File: {RESULTS_FILE}")
-logger.info(f"LSTM API URL: {LSTM_API_URL}")
+@functools.lru_cache(maxsize=1024)
+def adjust_calldata(predicted_tick: int) -> bytes:
+    """updatePredictionAndAdjust(int24) calldata; LSTM ticks cluster, so repeats are a dict hit."""
+    return ADJUST_SELECTOR + predicted_tick.to_bytes(32, 'big', signed=True)
 
 
 class PredictiveTest(LiquidityTestBase):
     """Test implementation for PredictiveLiquidityManager contract testing on a fork."""
 
+    RESULTS_FILE = RESULTS_FILE
+    GAS_CAP_FILE = GAS_CAP_FILE
+    CSV_COLUMNS = CSV_COLUMNS
+    METRICS_TEMPLATE = _METRICS_TEMPLATE
+    CSV_FLUSH_EVERY_ROWS = CSV_FLUSH_EVERY_ROWS
+    CSV_FLUSH_EVERY_SECONDS = CSV_FLUSH_EVERY_SECONDS
+
     def __init__(self, contract_address: str):
         self.ACTION_STATES = {
             "INIT": "init", "SETUP_FAILED": "setup_failed",
             "POOL_READ_FAILED": "pool_read_failed", "API_FAILED": "api_failed",
             "CALCULATION_FAILED": "calculation_failed", "FUNDING_FAILED": "funding_failed",
+            "SKIPPED_IN_RANGE": "skipped_in_range", "SKIPPED_IN_RANGE_CACHED": "skipped_in_range_cached",
             "TX_SENT": "tx_sent", "TX_SUCCESS_ADJUSTED": "tx_success_adjusted",
             "TX_REVERTED": "tx_reverted", "TX_WAIT_FAILED": "tx_wait_failed",
             "METRICS_UPDATE_FAILED": "metrics_update_failed",
             "UNEXPECTED_ERROR": "unexpected_error"
         }
         super().__init__(contract_address, "PredictiveLiquidityManager")
-        self.metrics = self._reset_metrics()
         self.pool_address = None
         self.pool_contract = None
-
-    def _reset_metrics(self):
-        return {
-            'timestamp': None, 'contract_type': 'Predictive',
-            'action_taken': self.ACTION_STATES["INIT"], 'tx_hash': None,
-            'predictedPrice_api': None, 'predictedTick_calculated': None,
-            'actualPrice_pool': None, 'sqrtPriceX96_pool': 0, 'currentTick_pool': 0,
-            'targetTickLower_calculated': 0, 'targetTickUpper_calculated': 0,
-            'finalTickLower_contract': 0, 'finalTickUpper_contract': 0, 'liquidity_contract': 0,
-            'gas_used': 0, 'gas_cost_eth': 0.0, 'error_message': ""
-        }
+        self.tick_spacing = None
+        self.chain_id = None
+        self._trace_dry_run = False
+        self._last_skip = None # {'predicted_tick', 'position', 'repeats'} of the last in-range skip
 
     def setup(self) -> bool:
         if not super().setup():
@@ -104,69 +177,93 @@ class PredictiveTest(LiquidityTestBase):
             self.metrics['error_message'] = "Base setup failed"
             return False
         try:
-            if not web3_utils.w3 or not web3_utils.w3.is_connected():
+            if not web3_utils.w3:
                 logger.error("web3_utils.w3 not available in PredictiveTest setup after base.setup()")
                 self.metrics['action_taken'] = self.ACTION_STATES["SETUP_FAILED"]
                 self.metrics['error_message'] = "web3_utils.w3 unavailable post base setup"
                 return False
 
-            factory_address = self.contract.functions.factory().call()
-            factory_contract = get_contract(factory_address, "IUniswapV3Factory")
-            fee = self.contract.functions.fee().call()
-            self.pool_address = factory_contract.functions.getPool(self.token0, self.token1, fee).call()
-            
-            if not self.pool_address or self.pool_address == '0x' + '0' * 40:
-                logger.error(f"Predictive pool address not found for {self.token0}/{self.token1} fee {fee}")
+            # Immutable for the session: resolve once instead of per transaction build
+            self.chain_id = web3_utils.get_chain_id()
+            client_version = web3_utils.w3.client_version.lower()
+            self._trace_dry_run = any(client in client_version for client in TRACE_DRY_RUN_CLIENTS)
+            private_key_env = os.getenv('PRIVATE_KEY')
+            if private_key_env:
+                try:
+                    self.account = Account.from_key(private_key_env)
+                except ValueError as e:
+                    logger.error("Failed to create account from PRIVATE_KEY: %s", e)
+            else:
+                logger.warning("PRIVATE_KEY not set; funding and adjustment transactions will be skipped.")
+
+            # One round-trip for factory + fee + tickSpacing, then the (cached) pool lookup that depends on them
+            factory_address, fee, self.tick_spacing = aggregate3([
+                self.contract.functions.factory(),
+                self.contract.functions.fee(),
+                self.contract.functions.tickSpacing(),
+            ])
+            self.pool_address = get_pool_address(factory_address, self.token0, self.token1, fee)
+
+            if not self.pool_address:
+                logger.error("Predictive pool address not found for %s/%s fee %s", self.token0, self.token1, fee)
                 self.metrics['action_taken'] = self.ACTION_STATES["SETUP_FAILED"]
                 self.metrics['error_message'] = f"Pool not found {self.token0}/{self.token1} fee {fee}"
                 return False
                 
             self.pool_contract = get_contract(self.pool_address, "IUniswapV3Pool")
-            logger.info(f"Predictive Pool contract initialized at {self.pool_address}")
+            logger.info("Predictive Pool contract initialized at %s", self.pool_address)
             return True
-        except Exception as e:
-            logger.exception(f"Predictive setup failed getting pool: {e}")
+        except RPC_ERRORS as e:
+            logger.error("Predictive setup failed getting pool: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             self.metrics['action_taken'] = self.ACTION_STATES["SETUP_FAILED"]
             self.metrics['error_message'] = f"Setup pool error: {str(e)}"
             return False
 
     def get_predicted_price_from_api(self) -> float | None:
+        predicted_price, fields = self._query_predicted_price()
+        self.metrics.update(fields)
+        return predicted_price
+
+    def _query_predicted_price(self) -> tuple[float | None, dict]:
+        """
+        (predicted price or None, metrics fields to record). Leaves self.metrics alone, so it can run in
+        a worker thread next to the pool read; the caller merges the fields on its own thread.
+        """
+        cached_price = get_cached_prediction(LSTM_API_URL)
+        if cached_price is not None:
+            logger.info("Using cached LSTM prediction (< %.0fs old): %.2f USD", PREDICTION_CACHE_TTL_S, cached_price)
+            return cached_price, {'predictedPrice_api': cached_price}
         try:
-            logger.info(f"Querying LSTM API at {LSTM_API_URL}...")
-            response = requests.get(LSTM_API_URL, timeout=15)
+            logger.info("Querying LSTM API at %s...", LSTM_API_URL)
+            response = _http_session.get(LSTM_API_URL, timeout=15)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             predicted_price_str = data.get('predicted_price')
 
             if predicted_price_str is None:
                 predicted_price_str = data.get('price') or data.get('prediction')
 
             if predicted_price_str is None:
-                logger.error(f"Predicted price key not found in API response. Data: {data}")
+                logger.error("Predicted price key not found in API response. Data: %s", data)
                 raise ValueError("Predicted price not in API response")
 
             if isinstance(predicted_price_str, str):
                 predicted_price_str = predicted_price_str.replace("USD", "").strip()
 
             predicted_price = float(predicted_price_str)
-            logger.info(f"Received predicted ETH price from API: {predicted_price:.2f} USD")
-            self.metrics['predictedPrice_api'] = predicted_price
-            return predicted_price
+            logger.info("Received predicted ETH price from API: %.2f USD", predicted_price)
+            store_prediction(LSTM_API_URL, predicted_price)
+            return predicted_price, {'predictedPrice_api': predicted_price}
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout when querying LSTM API at {LSTM_API_URL}")
-            self.metrics['action_taken'] = self.ACTION_STATES["API_FAILED"]
-            self.metrics['error_message'] = f"API Timeout: {LSTM_API_URL}"
-            return None
+            logger.error("Timeout when querying LSTM API at %s", LSTM_API_URL)
+            error_message = f"API Timeout: {LSTM_API_URL}"
         except requests.exceptions.RequestException as e:
-            logger.exception(f"Error getting prediction from API {LSTM_API_URL}: {e}")
-            self.metrics['action_taken'] = self.ACTION_STATES["API_FAILED"]
-            self.metrics['error_message'] = f"API Request Error: {str(e)}"
-            return None
-        except (ValueError, KeyError) as e:
-            logger.exception(f"Error processing API response from {LSTM_API_URL}: {e}")
-            self.metrics['action_taken'] = self.ACTION_STATES["API_FAILED"]
-            self.metrics['error_message'] = f"API Response Processing Error: {str(e)}"
-            return None
+            logger.error("Error getting prediction from API %s: %s", LSTM_API_URL, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            error_message = f"API Request Error: {str(e)}"
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error("Error processing API response from %s: %s", LSTM_API_URL, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            error_message = f"API Response Processing Error: {str(e)}"
+        return None, {'action_taken': self.ACTION_STATES["API_FAILED"], 'error_message': error_message}
 
 
     def calculate_tick_from_price(self, price: float) -> int | None:
@@ -176,110 +273,196 @@ class PredictiveTest(LiquidityTestBase):
             self.metrics['error_message'] = "Token decimals missing for tick calc"
             return None
         try:
-            price_decimal = Decimal(str(price))
-            
-            # tick = floor( log_{sqrt(1.0001)}(sqrt_price_adjusted_for_decimals) )
-            # sqrt_price_adjusted_for_decimals = sqrt(price_T1/T0 * 10^(decimals_T0 - decimals_T1))
-            effective_sqrt_price_arg = price_decimal * (Decimal(10)**(self.token0_decimals - self.token1_decimals))
-            if effective_sqrt_price_arg <= 0:
-                logger.error(f"Argument for sqrt in tick calculation is non-positive: {effective_sqrt_price_arg}")
+            price = float(price)
+            # Non-positive, NaN and infinite prices have no tick
+            if not (price > 0 and math.isfinite(price)):
+                logger.error("Price for tick calculation is not a positive finite number: %s", price)
                 self.metrics['action_taken'] = self.ACTION_STATES["CALCULATION_FAILED"]
-                self.metrics['error_message'] = "Invalid arg for sqrt in tick calc"
+                self.metrics['error_message'] = "Invalid price for tick calc"
                 return None
-            
-            effective_sqrt_price = effective_sqrt_price_arg.sqrt()
-            
-            if effective_sqrt_price <= 0: # Should not happen if arg > 0, but as a safeguard
-                logger.error(f"Effective sqrt price for tick calculation is non-positive: {effective_sqrt_price}")
-                self.metrics['action_taken'] = self.ACTION_STATES["CALCULATION_FAILED"]
-                self.metrics['error_message'] = "Invalid effective_sqrt_price for tick calc"
-                return None
-
-            # log_base_sqrt_1_0001_of_X  =  ln(X) / ln(sqrt(1.0001))
-            tick = math.floor(math.log(float(effective_sqrt_price)) / math.log(math.sqrt(1.0001)))
 
-            tick = max(MIN_TICK_CONST, min(MAX_TICK_CONST, tick))
-            logger.info(f"Calculated tick {tick} from price {price:.2f}")
+            # tick = floor( log_{1.0001}(price_T1/T0 * 10^(decimals_T0 - decimals_T1)) ), clamped to the tick range,
+            # resolved with integer TickMath so boundary prices land on the same tick as on-chain
+            tick = price_to_tick_exact(price, self.token0_decimals, self.token1_decimals)
+            logger.info("Calculated tick %s from price %.2f", tick, price)
             self.metrics['predictedTick_calculated'] = tick
             return tick
-        except Exception as e:
-            logger.exception(f"Failed to calculate predicted tick from price {price}: {e}")
+        except (ValueError, OverflowError, TypeError) as e:
+            logger.error("Failed to calculate predicted tick from price %s: %s", price, e, exc_info=logger.isEnabledFor(logging.DEBUG))
             self.metrics['action_taken'] = self.ACTION_STATES["CALCULATION_FAILED"]
             self.metrics['error_message'] = f"Tick Calculation Error: {str(e)}"
             return None
 
-    def update_pool_and_position_metrics(self, final_update=False):
+    def update_pool_and_position_metrics(self, final_update=False) -> dict | None:
+        position_info, fields = self._read_pool_and_position(final_update)
+        self._merge_metrics(fields)
+        return position_info
+
+    def _merge_metrics(self, fields: dict):
+        """Record worker results; an error_message already set this cycle is kept (first error wins)."""
+        if self.metrics['error_message']:
+            fields.pop('error_message', None)
+        self.metrics.update(fields)
+
+    def _read_pool_and_position(self, final_update=False) -> tuple[dict | None, dict]:
+        """
+        (position info or None, metrics fields to record) from one pool + position read.
+        Like _query_predicted_price it only returns the fields, so both can run in worker threads.
+        """
+        position_info = None
+        fields = {}
         try:
+            position_fn = self._position_function()
             if self.pool_contract:
-                slot0 = self.pool_contract.functions.slot0().call()
-                sqrt_price_x96_pool, current_tick_pool = slot0[0], slot0[1]
-                self.metrics['sqrtPriceX96_pool'] = sqrt_price_x96_pool
-                self.metrics['currentTick_pool'] = current_tick_pool
-                self.metrics['actualPrice_pool'] = self._calculate_actual_price(sqrt_price_x96_pool)
+                # slot0 is decoded from the pool's raw storage word, batched with the position read
+                (sqrt_price_x96_pool, current_tick_pool, _), raw_position = read_slot0_and_call(self.pool_address, position_fn)
+                fields['sqrtPriceX96_pool'] = sqrt_price_x96_pool
+                fields['currentTick_pool'] = current_tick_pool
+                fields['actualPrice_pool'] = self._calculate_actual_price(sqrt_price_x96_pool)
+                if position_fn is not None:
+                    position_info = self._parse_position(raw_position)
             else:
                 logger.warning("Pool contract not available for metrics update.")
-                self.metrics['action_taken'] = self.ACTION_STATES["POOL_READ_FAILED"]
-                self.metrics['error_message'] = self.metrics.get('error_message',"") + ";Pool contract missing for metrics"
+                fields['action_taken'] = self.ACTION_STATES["POOL_READ_FAILED"]
+                fields['error_message'] = "Pool contract missing for metrics"
+                position_info = self.get_position_info()
 
-            position_info = self.get_position_info()
             if position_info:
                 if final_update:
-                    self.metrics['finalTickLower_contract'] = position_info.get('tickLower', 0)
-                    self.metrics['finalTickUpper_contract'] = position_info.get('tickUpper', 0)
-                    self.metrics['liquidity_contract'] = position_info.get('liquidity', 0)
+                    fields['finalTickLower_contract'] = position_info.get('tickLower', 0)
+                    fields['finalTickUpper_contract'] = position_info.get('tickUpper', 0)
+                    fields['liquidity_contract'] = position_info.get('liquidity', 0)
             else:
                 logger.warning("Could not get position info from contract for metrics.")
 
-        except Exception as e:
-            logger.exception(f"Error updating pool/position metrics: {e}")
-            self.metrics['action_taken'] = self.ACTION_STATES["METRICS_UPDATE_FAILED"]
-            if not self.metrics.get('error_message'): self.metrics['error_message'] = f"Metrics Update Error: {str(e)}"
+        except RPC_ERRORS as e:
+            logger.error("Error updating pool/position metrics: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            fields['action_taken'] = self.ACTION_STATES["METRICS_UPDATE_FAILED"]
+            fields['error_message'] = f"Metrics Update Error: {str(e)}"
+        return position_info, fields
+
+    def _prediction_within_position(self, predicted_tick: int, position_info: dict | None) -> bool:
+        """True if the predicted tick sits inside the active position with at least the buffer to spare."""
+        if not position_info or not position_info.get('active'):
+            return False
+        buffer = IN_RANGE_BUFFER_TICKS if IN_RANGE_BUFFER_TICKS is not None else (self.tick_spacing or 0)
+        return position_info['tickLower'] + buffer <= predicted_tick <= position_info['tickUpper'] - buffer
+
+
+    def _tx_params(self) -> dict:
+        """from/nonce/chainId/fee fields from the local nonce counter and web3_utils' cached fee params."""
+        return {'from': self.account.address, 'nonce': self._next_nonce(), 'chainId': self.chain_id, **web3_utils.get_fee_params()}
+
+    def _dry_run_adjust(self, tx: dict) -> dict | None:
+        """
+        Simulate the adjustment with debug_traceCall (callTracer) on the pending tx fields.
+        Returns {'gas_used': int, 'error': str | None}, or None if the node can't trace the call.
+        """
+        call = {'from': tx['from'], 'to': tx['to'], 'value': hex(tx['value']), 'data': '0x' + tx['data'].hex()}
+        try:
+            response = web3_utils.w3.provider.make_request('debug_traceCall', [call, 'latest', {'tracer': 'callTracer'}])
+        except RPC_ERRORS as e:
+            logger.warning("debug_traceCall dry-run failed (%s); using the learned gas cap instead.", e)
+            return None
+        trace = response.get('result')
+        if not trace or 'gasUsed' not in trace:
+            logger.warning("debug_traceCall unavailable (%s); disabling the dry-run.", response.get('error'))
+            self._trace_dry_run = False
+            return None
+        error = trace.get('error')
+        if error and trace.get('revertReason'):
+            error = f"{error}: {trace['revertReason']}"
+        return {'gas_used': int(trace['gasUsed'], 16), 'error': error}
+
+    def _send_signed(self, tx: dict):
+        """Sign locally with the deployer account, send raw and wait for the receipt. Returns None on failure."""
+        tx_hash = self._broadcast_signed(tx)
+        return self._wait_for_receipt(tx_hash) if tx_hash else None
+
+    def _broadcast_signed(self, tx: dict):
+        """Sign and send without waiting, advancing the local nonce. Returns the tx hash, or None on failure."""
+        try:
+            signed_tx = self.account.sign_transaction(tx)
+            tx_hash = web3_utils.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except RPC_ERRORS as e:
+            logger.error("Sending transaction failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            self._nonce = None # Re-sync from the node before the next transaction
+            return None
+        self._nonce = tx['nonce'] + 1
+        logger.info("Transaction sent: %s", tx_hash.hex())
+        return tx_hash
 
+    def _wait_for_receipt(self, tx_hash):
+        """Wait for a sent tx. Returns None on failure."""
+        try:
+            receipt = wait_for_receipt(tx_hash)
+        except RPC_ERRORS as e:
+            logger.error("Waiting for transaction receipt failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            self._nonce = None
+            return None
+        logger.info("Transaction confirmed in block: %s, Status: %s", receipt.blockNumber, receipt.status)
+        return receipt
+
+    def _funding_tokens(self) -> tuple[str, str, int]:
+        """(WETH address, USDC address, USDC decimals) of the pool pair; the 6-decimal token is USDC."""
+        if self.token0_decimals == 6:
+            return self.token1, self.token0, self.token0_decimals
+        return self.token0, self.token1, self.token1_decimals
+
+    def _read_funding_balances(self) -> list[int] | None:
+        """Contract and deployer WETH/USDC balances in one Multicall3 call; None without an account or on RPC error."""
+        if self.account is None:
+            return None
+        weth_token_addr, usdc_token_addr, _ = self._funding_tokens()
+        try:
+            return erc20_balances([
+                (weth_token_addr, self.contract_address),
+                (usdc_token_addr, self.contract_address),
+                (weth_token_addr, self.account.address),
+                (usdc_token_addr, self.account.address),
+            ])
+        except RPC_ERRORS as e:
+            logger.warning("Prefetching funding balances failed (%s); funding will read them itself.", e)
+            return None
 
-    def fund_contract_if_needed(self, min_weth=MIN_WETH_TO_FUND_CONTRACT, min_usdc=MIN_USDC_TO_FUND_CONTRACT) -> bool:
-        if not web3_utils.w3 or not web3_utils.w3.is_connected():
+    def fund_contract_if_needed(self, min_weth=MIN_WETH_TO_FUND_CONTRACT, min_usdc=MIN_USDC_TO_FUND_CONTRACT, balances=None) -> bool:
+        """Top up the contract's WETH/USDC from the deployer. `balances` may carry a fresh _read_funding_balances() result."""
+        if not web3_utils.w3:
             if not web3_utils.init_web3():
                 logger.error("Web3 connection failed in fund_contract_if_needed.")
                 self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
                 self.metrics['error_message'] = "W3 init fail in fund_contract"
                 return False
         
-        if not web3_utils.w3 or not web3_utils.w3.is_connected():
+        if not web3_utils.w3:
             logger.error("web3_utils.w3 is still not available after init attempt in fund_contract_if_needed.")
             self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
             self.metrics['error_message'] = "W3 unavailable post init in fund_contract"
             return False
 
-        private_key_env = os.getenv('PRIVATE_KEY')
-        if not private_key_env:
-            logger.error("PRIVATE_KEY environment variable not set for funding.")
+        account = self.account
+        if account is None:
+            logger.error("No deployer account (PRIVATE_KEY missing or invalid) for funding.")
             self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
             self.metrics['error_message'] = "PRIVATE_KEY missing for funding"
             return False
-        
-        try:
-            account = Account.from_key(private_key_env)
-        except Exception as e:
-            logger.error(f"Failed to create account from PRIVATE_KEY: {e}")
-            self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
-            self.metrics['error_message'] = f"Bad PRIVATE_KEY: {e}"
-            return False
             
-        contract_addr_checksum = Web3.to_checksum_address(self.contract_address)
 
         try:
-            token0_is_usdc = self.token0_decimals == 6
-            weth_token_addr = self.token1 if token0_is_usdc else self.token0
-            usdc_token_addr = self.token0 if token0_is_usdc else self.token1
-            usdc_decimals_val = self.token0_decimals if token0_is_usdc else self.token1_decimals
-
+            weth_token_addr, usdc_token_addr, usdc_decimals_val = self._funding_tokens()
 
             weth_contract = get_contract(weth_token_addr, "IERC20")
             usdc_contract = get_contract(usdc_token_addr, "IERC20")
 
-            contract_weth_bal = weth_contract.functions.balanceOf(contract_addr_checksum).call()
-            contract_usdc_bal = usdc_contract.functions.balanceOf(contract_addr_checksum).call()
-            logger.info(f"Contract balances before funding check: WETH={Web3.from_wei(contract_weth_bal, 'ether')}, USDC={contract_usdc_bal / (10**usdc_decimals_val):.6f}")
+            # Contract and deployer balances for both tokens in one Multicall3 round-trip (unless prefetched)
+            if balances is None:
+                balances = self._read_funding_balances()
+                if balances is None:
+                    self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
+                    self.metrics['error_message'] = "Balance read failed"
+                    return False
+            contract_weth_bal, contract_usdc_bal, deployer_weth_bal, deployer_usdc_bal = balances
+            logger.info("Contract balances before funding check: WETH=%s, USDC=%s", format_token_amount(contract_weth_bal), format_token_amount(contract_usdc_bal, usdc_decimals_val))
 
 
             fund_weth = contract_weth_bal < min_weth
@@ -290,18 +473,27 @@ class PredictiveTest(LiquidityTestBase):
                 return True
 
             logger.info("Attempting to fund contract...")
-            current_nonce = web3_utils.w3.eth.get_transaction_count(account.address)
+            needed_weth = min_weth - contract_weth_bal if fund_weth else 0
+            needed_usdc = min_usdc - contract_usdc_bal if fund_usdc else 0
+
+            if fund_usdc:
+                logger.info("Contract needs %s USDC.", format_token_amount(needed_usdc, usdc_decimals_val))
+                if deployer_usdc_bal < needed_usdc:
+                    logger.error("Deployer has insufficient USDC (%s).", format_token_amount(deployer_usdc_bal, usdc_decimals_val))
+                    self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
+                    self.metrics['error_message'] = "Insufficient USDC"
+                    return False
 
             if fund_weth:
-                needed_weth = min_weth - contract_weth_bal
-                logger.info(f"Contract needs {Web3.from_wei(needed_weth, 'ether')} WETH.")
-                deployer_weth_bal = weth_contract.functions.balanceOf(account.address).call()
+                logger.info("Contract needs %s WETH.", format_token_amount(needed_weth))
 
                 if deployer_weth_bal < needed_weth:
-                    logger.warning(f"Deployer has insufficient WETH ({Web3.from_wei(deployer_weth_bal, 'ether')}). Attempting to wrap ETH...")
+                    logger.warning("Deployer has insufficient WETH (%s). Attempting to wrap ETH...", format_token_amount(deployer_weth_bal))
                     eth_needed_for_wrap = needed_weth - deployer_weth_bal + Web3.to_wei(0.001, 'ether')
-                    if web3_utils.wrap_eth_to_weth(eth_needed_for_wrap):
-                        time.sleep(3) 
+                    wrap_nonce = self._next_nonce()
+                    wrapped = web3_utils.wrap_eth_to_weth(eth_needed_for_wrap, nonce=wrap_nonce)
+                    self._nonce = wrap_nonce + 1 if wrapped else None
+                    if wrapped:
                         deployer_weth_bal = weth_contract.functions.balanceOf(account.address).call()
                     else:
                         logger.error("Failed to wrap ETH for WETH funding.")
@@ -309,55 +501,44 @@ class PredictiveTest(LiquidityTestBase):
                         self.metrics['error_message'] = "ETH wrapping failed"
                         return False
 
-                if deployer_weth_bal >= needed_weth:
-                    logger.info(f"Transferring {Web3.from_wei(needed_weth, 'ether')} WETH from deployer to contract {contract_addr_checksum}...")
-                    tx_transfer_params = {'from': account.address, 'nonce': current_nonce, 'chainId': int(web3_utils.w3.net.version)}
-                    built_tx = weth_contract.functions.transfer(contract_addr_checksum, needed_weth).build_transaction(tx_transfer_params)
-                    receipt = send_transaction(built_tx) 
-
-                    if receipt and receipt.status == 1:
-                        logger.info(f"WETH transfer successful. Tx: {receipt.transactionHash.hex()}")
-                        current_nonce += 1
-                        time.sleep(3) 
-                    else:
-                        logger.error(f"WETH transfer to contract failed. Receipt: {receipt}")
-                        self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
-                        self.metrics['error_message'] = "WETH transfer tx failed"
-                        return False
-                else:
-                    logger.error(f"Deployer still has insufficient WETH ({Web3.from_wei(deployer_weth_bal, 'ether')}) after wrap attempt.")
+                if deployer_weth_bal < needed_weth:
+                    logger.error("Deployer still has insufficient WETH (%s) after wrap attempt.", format_token_amount(deployer_weth_bal))
                     self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
                     self.metrics['error_message'] = "Insufficient WETH post-wrap"
                     return False
-            
+
+            # Both transfers go out back-to-back on consecutive nonces, then we wait for both
+            # receipts, so paired funding costs one inclusion wait instead of two
+            transfers = []
+            if fund_weth:
+                logger.info("Transferring %s WETH from deployer to contract %s...", format_token_amount(needed_weth), self.contract_address)
+                transfers.append(("WETH", weth_contract.functions.transfer(self.contract_address, needed_weth)))
             if fund_usdc:
-                needed_usdc = min_usdc - contract_usdc_bal
-                logger.info(f"Contract needs {needed_usdc / (10**usdc_decimals_val):.6f} USDC.")
-                deployer_usdc_bal = usdc_contract.functions.balanceOf(account.address).call()
-
-                if deployer_usdc_bal >= needed_usdc:
-                    logger.info(f"Transferring {needed_usdc / (10**usdc_decimals_val):.6f} USDC from deployer to contract {contract_addr_checksum}...")
-                    tx_transfer_params = {'from': account.address, 'nonce': current_nonce, 'chainId': int(web3_utils.w3.net.version)}
-                    built_tx = usdc_contract.functions.transfer(contract_addr_checksum, needed_usdc).build_transaction(tx_transfer_params)
-                    receipt = send_transaction(built_tx)
-
-                    if receipt and receipt.status == 1:
-                        logger.info(f"USDC transfer successful. Tx: {receipt.transactionHash.hex()}")
-                        time.sleep(3)
-                    else:
-                        logger.error(f"USDC transfer to contract failed. Receipt: {receipt}")
-                        self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
-                        self.metrics['error_message'] = "USDC transfer tx failed"
-                        return False
+                logger.info("Transferring %s USDC from deployer to contract %s...", format_token_amount(needed_usdc, usdc_decimals_val), self.contract_address)
+                transfers.append(("USDC", usdc_contract.functions.transfer(self.contract_address, needed_usdc)))
+
+            sent = []
+            for token_label, transfer_fn in transfers:
+                tx_hash = self._broadcast_signed(transfer_fn.build_transaction(self._tx_params()))
+                sent.append((token_label, tx_hash))
+                if tx_hash is None:
+                    break
+
+            for token_label, tx_hash in sent:
+                receipt = self._wait_for_receipt(tx_hash) if tx_hash else None
+                if receipt and receipt.status == 1:
+                    logger.info("%s transfer successful. Tx: %s", token_label, receipt.transactionHash.hex())
                 else:
-                    logger.error(f"Deployer has insufficient USDC ({deployer_usdc_bal / (10**usdc_decimals_val):.6f}).")
+                    logger.error("%s transfer to contract failed. Receipt: %s", token_label, receipt)
                     self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
-                    self.metrics['error_message'] = "Insufficient USDC"
+                    self.metrics['error_message'] = f"{token_label} transfer tx failed"
                     return False
 
-            contract_weth_bal_final = weth_contract.functions.balanceOf(contract_addr_checksum).call()
-            contract_usdc_bal_final = usdc_contract.functions.balanceOf(contract_addr_checksum).call()
-            logger.info(f"Balances after funding attempt: WETH={Web3.from_wei(contract_weth_bal_final, 'ether')}, USDC={contract_usdc_bal_final / (10**usdc_decimals_val):.6f}")
+            contract_weth_bal_final, contract_usdc_bal_final = erc20_balances([
+                (weth_token_addr, self.contract_address),
+                (usdc_token_addr, self.contract_address),
+            ])
+            logger.info("Balances after funding attempt: WETH=%s, USDC=%s", format_token_amount(contract_weth_bal_final), format_token_amount(contract_usdc_bal_final, usdc_decimals_val))
             
             if contract_weth_bal_final < min_weth or contract_usdc_bal_final < min_usdc:
                 logger.error("Contract balances still below minimum after funding attempt.")
@@ -366,25 +547,80 @@ class PredictiveTest(LiquidityTestBase):
                 return False
             return True
 
-        except Exception as e:
-            logger.exception(f"Error during fund_contract_if_needed: {e}")
+        except RPC_ERRORS as e:
+            logger.error("Error during fund_contract_if_needed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             self.metrics['action_taken'] = self.ACTION_STATES["FUNDING_FAILED"]
             self.metrics['error_message'] = f"Fund contract exception: {str(e)}"
             return False
 
+    async def _fetch_cycle_inputs(self) -> tuple[float | None, dict | None, list[int] | None]:
+        """
+        Run the LSTM API request, the pool/position read and the funding balance read concurrently.
+        Returns (predicted price, position, funding balances); the balances are only used if the cycle funds.
+        The workers only return metrics fields; they are merged here, after gather, in a fixed order.
+        """
+        (predicted_price, api_fields), (position_info, pool_fields), balances = await asyncio.gather(
+            asyncio.to_thread(self._query_predicted_price),
+            asyncio.to_thread(self._read_pool_and_position, False),
+            asyncio.to_thread(self._read_funding_balances),
+        )
+        self._merge_metrics(pool_fields)
+        # An API failure is the reason this cycle stops, so its status overrides the pool read's
+        self.metrics.update(api_fields)
+        return predicted_price, position_info, balances
+
+    def _record_in_range_skip(self, position_info: dict, cached=False):
+        self.metrics['action_taken'] = self.ACTION_STATES["SKIPPED_IN_RANGE_CACHED" if cached else "SKIPPED_IN_RANGE"]
+        self.metrics['finalTickLower_contract'] = position_info['tickLower']
+        self.metrics['finalTickUpper_contract'] = position_info['tickUpper']
+        self.metrics['liquidity_contract'] = position_info['liquidity']
+        self.save_metrics()
+
+    async def _repeat_skip(self) -> bool:
+        """
+        After an in-range skip, fetch only the prediction. If it maps to the same tick as that cycle,
+        record the skip again from the remembered position without any pool, position or balance reads.
+        The row is marked skipped_in_range_cached and its pool columns are left blank, since the pool
+        was not read this cycle; the predicted price and tick are this cycle's own.
+        """
+        last = self._last_skip
+        if last is None or last['repeats'] >= SKIP_RECHECK_CYCLES:
+            return False
+        predicted_price, api_fields = await asyncio.to_thread(self._query_predicted_price)
+        if predicted_price is None:
+            return False # The full cycle re-queries the API and records the failure itself
+        self.metrics.update(api_fields)
+        if self.calculate_tick_from_price(predicted_price) != last['predicted_tick']:
+            self._reset_metrics() # Start the full cycle from a clean row
+            return False # Its API query is then served from the prediction cache
+        last['repeats'] += 1
+        logger.info("Predicted tick %s unchanged since the last in-range skip. Skipping on-chain checks (%s/%s).",
+                    last['predicted_tick'], last['repeats'], SKIP_RECHECK_CYCLES)
+        self.metrics.update(sqrtPriceX96_pool=None, currentTick_pool=None, actualPrice_pool=None)
+        self._record_in_range_skip(last['position'], cached=True)
+        return True
+
     def adjust_position(self) -> bool:
-        self.metrics = self._reset_metrics()
+        return asyncio.run(self.adjust_position_async())
+
+    async def adjust_position_async(self) -> bool:
+        self._reset_metrics()
         adjustment_call_success = False
 
         try:
-            if not web3_utils.w3 or not web3_utils.w3.is_connected():
+            if not web3_utils.w3:
                 logger.error("Web3 not connected at start of adjust_position.")
                 self.metrics['action_taken'] = self.ACTION_STATES["SETUP_FAILED"] 
                 self.metrics['error_message'] = "W3 unavailable in adjust_position"
                 self.save_metrics()
                 return False
 
-            predicted_price = self.get_predicted_price_from_api()
+            if await self._repeat_skip():
+                return True
+            self._last_skip = None
+
+            # LSTM prediction, pool state and funding balances are independent, so fetch them together
+            predicted_price, position_info, balances = await self._fetch_cycle_inputs()
             if predicted_price is None:
                 self.save_metrics()
                 return False
@@ -394,81 +630,74 @@ class PredictiveTest(LiquidityTestBase):
                 self.save_metrics()
                 return False
 
-            self.update_pool_and_position_metrics(final_update=False)
+            if self._prediction_within_position(predicted_tick, position_info):
+                logger.info("Predicted tick %s is inside current range [%s, %s]. Skipping adjustment call.", predicted_tick, position_info['tickLower'], position_info['tickUpper'])
+                self._last_skip = {'predicted_tick': predicted_tick, 'position': position_info, 'repeats': 0}
+                self._record_in_range_skip(position_info)
+                return True
 
-            if not self.fund_contract_if_needed():
+            if not self.fund_contract_if_needed(balances=balances):
                 logger.error("Funding contract failed. Cannot proceed with adjustment.")
                 self.save_metrics()
                 return False
 
-            logger.info(f"Calling updatePredictionAndAdjust with predictedTick: {predicted_tick}")
-            private_key_env = os.getenv('PRIVATE_KEY')
-            if not private_key_env:
-                logger.error("PRIVATE_KEY not found for adjust_position.")
+            logger.info("Calling updatePredictionAndAdjust with predictedTick: %s", predicted_tick)
+            account = self.account
+            if account is None:
+                logger.error("No deployer account (PRIVATE_KEY missing or invalid) for adjust_position.")
                 self.metrics['action_taken'] = self.ACTION_STATES["UNEXPECTED_ERROR"]
                 self.metrics['error_message'] = "PRIVATE_KEY missing for adjustment tx"
                 self.save_metrics()
                 return False
-            
-            try:
-                account = Account.from_key(private_key_env)
-            except Exception as e:
-                logger.error(f"Failed to load account from PRIVATE_KEY for adjustment: {e}")
-                self.metrics['action_taken'] = self.ACTION_STATES["UNEXPECTED_ERROR"]
-                self.metrics['error_message'] = f"Bad PRIVATE_KEY for adjustment: {e}"
-                self.save_metrics()
-                return False
-
-
-            current_nonce = web3_utils.w3.eth.get_transaction_count(account.address)
 
             try:
-                tx_function = self.contract.functions.updatePredictionAndAdjust(predicted_tick)
-                tx_params = {
-                    'from': account.address,
-                    'nonce': current_nonce,
-                    'chainId': int(web3_utils.w3.net.version)
-                }
-                
-                try:
-                    pre_tx = tx_function.build_transaction({'from': account.address, 'nonce': current_nonce, 'chainId': tx_params['chainId']})
-                    estimated_gas = web3_utils.w3.eth.estimate_gas(pre_tx)
-                    tx_params['gas'] = int(estimated_gas * 1.25) 
-                    logger.info(f"Estimated gas for adjustment: {estimated_gas}, using: {tx_params['gas']}")
-                except Exception as est_err:
-                    logger.warning(f"Gas estimation failed for adjustment: {est_err}. Using default 1,500,000")
-                    tx_params['gas'] = 1500000
+                tx_params = self._tx_params()
+                tx_params['to'] = self.contract_address
+                tx_params['value'] = 0
+                tx_params['data'] = adjust_calldata(predicted_tick)
+                tx_params['gas'] = self._adjust_gas_limit()
+                trace = self._dry_run_adjust(tx_params) if self._trace_dry_run else None
+                if trace and trace['error']:
+                    logger.error("Adjustment dry-run reverted (%s). Not sending the transaction.", trace['error'])
+                    self.metrics['action_taken'] = self.ACTION_STATES["TX_REVERTED"]
+                    self.metrics['error_message'] = f"dry_run_reverted: {trace['error']}"
+                    self.save_metrics()
+                    return False
+                if trace:
+                    tx_params['gas'] = int(trace['gas_used'] * TRACE_GAS_HEADROOM)
+                logger.info("Using gas limit %s for adjustment (learned gasUsed: %s)", tx_params['gas'], self._adjust_gas_used)
 
-                final_tx_to_send = tx_function.build_transaction(tx_params)
-                receipt = send_transaction(final_tx_to_send)
+                receipt = self._send_signed(tx_params)
 
                 self.metrics['tx_hash'] = receipt.transactionHash.hex() if receipt else None
                 self.metrics['action_taken'] = self.ACTION_STATES["TX_SENT"]
 
                 if receipt and receipt.status == 1:
-                    logger.info(f"Adjustment transaction successful (Status 1). Tx: {self.metrics['tx_hash']}")
+                    logger.info("Adjustment transaction successful (Status 1). Tx: %s", self.metrics['tx_hash'])
                     self.metrics['gas_used'] = receipt.get('gasUsed', 0)
                     if receipt.get('effectiveGasPrice'):
-                        self.metrics['gas_cost_eth'] = float(Web3.from_wei(receipt.gasUsed * receipt.effectiveGasPrice, 'ether'))
+                        self.metrics['gas_cost_eth'] = receipt.gasUsed * receipt.effectiveGasPrice / 10**18
                     self.metrics['action_taken'] = self.ACTION_STATES["TX_SUCCESS_ADJUSTED"]
                     adjustment_call_success = True
+                    self._learn_adjust_gas(receipt, tx_params['gas'])
                 elif receipt: 
-                    logger.error(f"Adjustment transaction reverted (Status 0). Tx: {self.metrics['tx_hash']}")
+                    logger.error("Adjustment transaction reverted (Status 0). Tx: %s", self.metrics['tx_hash'])
                     self.metrics['action_taken'] = self.ACTION_STATES["TX_REVERTED"]
                     self.metrics['error_message'] = "tx_reverted_onchain"
                     self.metrics['gas_used'] = receipt.get('gasUsed', 0)
+                    self._learn_adjust_gas(receipt, tx_params['gas'])
                     if receipt.get('effectiveGasPrice'):
-                        self.metrics['gas_cost_eth'] = float(Web3.from_wei(receipt.gasUsed * receipt.effectiveGasPrice, 'ether'))
+                        self.metrics['gas_cost_eth'] = receipt.gasUsed * receipt.effectiveGasPrice / 10**18
                     adjustment_call_success = False
                 else: 
                     logger.error("Adjustment transaction sending/receipt failed.")
                     if self.metrics['action_taken'] == self.ACTION_STATES["TX_SENT"]: 
                         self.metrics['action_taken'] = self.ACTION_STATES["TX_WAIT_FAILED"]
-                    if not self.metrics['error_message']: self.metrics['error_message'] = "send_transaction for adjustment failed"
+                    if not self.metrics['error_message']: self.metrics['error_message'] = "Sending adjustment transaction failed"
                     adjustment_call_success = False
 
-            except Exception as tx_err:
-                logger.exception(f"Error during adjustment transaction call/wait: {tx_err}")
+            except RPC_ERRORS as tx_err:
+                logger.error("Error during adjustment transaction call/wait: %s", tx_err, exc_info=logger.isEnabledFor(logging.DEBUG))
                 self.metrics['action_taken'] = self.ACTION_STATES["UNEXPECTED_ERROR"]
                 self.metrics['error_message'] = f"TxError: {str(tx_err)}"
                 self.save_metrics()
@@ -479,80 +708,83 @@ class PredictiveTest(LiquidityTestBase):
             return adjustment_call_success
 
         except Exception as e:
+            # Last line of defence: whatever escaped the narrower handlers, the cycle still gets its row
             logger.exception("Unexpected error in adjust_position:")
             self.metrics['action_taken'] = self.ACTION_STATES["UNEXPECTED_ERROR"]
-            if not self.metrics.get('error_message'): self.metrics['error_message'] = str(e)
+            if not self.metrics.get('error_message'): self.metrics['error_message'] = f"{type(e).__name__}: {e}"
             self.save_metrics()
             return False
 
-    def save_metrics(self):
-        self.metrics['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        columns = [
-            'timestamp', 'contract_type', 'action_taken', 'tx_hash',
-            'predictedPrice_api', 'predictedTick_calculated',
-            'actualPrice_pool', 'sqrtPriceX96_pool', 'currentTick_pool',
-            'targetTickLower_calculated', 'targetTickUpper_calculated',
-            'finalTickLower_contract', 'finalTickUpper_contract', 'liquidity_contract',
-            'gas_used', 'gas_cost_eth', 'error_message'
-        ]
-        try:
-            RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
-            file_exists = RESULTS_FILE.is_file()
-            row_data = {col: self.metrics.get(col, "") for col in columns}
-
-            with open(RESULTS_FILE, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(row_data)
-            logger.info(f"Predictive metrics saved to {RESULTS_FILE}")
-        except Exception as e:
-            logger.exception(f"Failed to save predictive metrics: {e}")
+# --- Adjustment Loop ---
+async def run_loop(test: PredictiveTest, interval_s: float, iterations: int) -> int:
+    """
+    Run `iterations` adjustment cycles on an already set-up PredictiveTest, starting one every `interval_s`
+    seconds, reusing its contracts, account, nonce counter and open results file. Returns the number of successful cycles.
+    """
+    successes = 0
+    next_run = time.monotonic()
+    for i in range(iterations):
+        logger.info("--- Adjustment cycle %s/%s ---", i + 1, iterations)
+        if await test.adjust_position_async():
+            successes += 1
+        if i < iterations - 1:
+            # Fixed monotonic deadlines: a slow cycle shortens the following wait instead of shifting the schedule
+            next_run += interval_s
+            await asyncio.sleep(max(0.0, next_run - time.monotonic()))
+    logger.info("Adjustment loop finished: %s/%s cycles succeeded.", successes, iterations)
+    return successes
 
 # --- Main Function ---
-def main():
-    logger.info("="*50)
-    logger.info("Starting Predictive Liquidity Manager Test on Fork")
-    logger.info("="*50)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run PredictiveLiquidityManager adjustment cycles on a fork.")
+    parser.add_argument('--iterations', type=int, default=env_number('PREDICTIVE_ITERATIONS', 1),
+                        help="adjustment cycles to run in this process (default: PREDICTIVE_ITERATIONS or 1)")
+    parser.add_argument('--interval', type=float, default=env_number('PREDICTIVE_INTERVAL_SECONDS', 60.0, float),
+                        help="seconds between cycles (default: PREDICTIVE_INTERVAL_SECONDS or 60)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger.info("%s\nStarting Predictive Liquidity Manager Test on Fork\n%s", "="*50, "="*50)
 
     if not web3_utils.init_web3():
         logger.critical("Web3 initialization failed. Exiting predictive test.")
         return
     
-    if not web3_utils.w3 or not web3_utils.w3.is_connected():
+    if not web3_utils.w3:
         logger.critical("web3_utils.w3 instance not available or not connected after init. Exiting predictive test.")
         return
 
     predictive_address = None
     try:
         if not ADDRESS_FILE_PREDICTIVE.exists():
-            logger.error(f"Predictive address file not found: {ADDRESS_FILE_PREDICTIVE}")
+            logger.error("Predictive address file not found: %s", ADDRESS_FILE_PREDICTIVE)
             raise FileNotFoundError(f"File not found: {ADDRESS_FILE_PREDICTIVE}")
 
-        logger.info(f"Reading predictive address from: {ADDRESS_FILE_PREDICTIVE}")
+        logger.info("Reading predictive address from: %s", ADDRESS_FILE_PREDICTIVE)
         with open(ADDRESS_FILE_PREDICTIVE, 'r') as f:
             content = f.read()
-            logger.debug(f"Predictive address file content: {content}")
-            addresses_data = json.loads(content)
+            logger.debug("Predictive address file content: %s", content)
+            addresses_data = json_loads(content)
             predictive_address = addresses_data.get('address')
             if not predictive_address:
-                logger.error(f"Key 'address' not found in {ADDRESS_FILE_PREDICTIVE}")
+                logger.error("Key 'address' not found in %s", ADDRESS_FILE_PREDICTIVE)
                 raise ValueError(f"Key 'address' not found in {ADDRESS_FILE_PREDICTIVE}")
-        logger.info(f"Loaded Predictive Manager Address: {predictive_address}")
+        logger.info("Loaded Predictive Manager Address: %s", predictive_address)
 
         test = PredictiveTest(predictive_address)
-        test.execute_test_steps()
+        # Extra cycles reuse this test's setup, session, CSV handle and compiled kernels instead of re-running the script
+        if test.execute_test_steps() and args.iterations > 1:
+            asyncio.run(run_loop(test, args.interval, args.iterations - 1))
 
     except FileNotFoundError as e:
-        logger.error(f"Setup Error - Address file not found: {e}")
+        logger.error("Setup Error - Address file not found: %s", e)
     except ValueError as e:
-        logger.error(f"Configuration Error - Problem reading address file or address key missing: {e}")
+        logger.error("Configuration Error - Problem reading address file or address key missing: %s", e)
     except Exception as e:
-        logger.exception(f"An unexpected error occurred during predictive main execution:")
+        logger.exception("An unexpected error occurred during predictive main execution:")
     finally:
-        logger.info("="*50)
-        logger.info("Predictive test run finished.")
-        logger.info("="*50)
+        logger.info("%s\nPredictive test run finished.\n%s", "="*50, "="*50)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
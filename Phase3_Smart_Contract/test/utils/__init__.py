@@ -1,11 +1,19 @@
 """Shared utilities for contract testing and blockchain interactions."""
 
-from .web3_utils import (
-    init_web3,
-    get_contract,
-    send_transaction,
-    wrap_eth_to_weth
-)
+import importlib
+
+# Exports are resolved on first access (PEP 562), so importing a light submodule such as
+# test.utils.tick_math does not pull in web3 through this package __init__.
+_EXPORTS = {
+    'init_web3': '.web3_utils',
+    'get_contract': '.web3_utils',
+    'send_transaction': '.web3_utils',
+    'wrap_eth_to_weth': '.web3_utils',
+    'aggregate3': '.multicall',
+    'price_to_tick': '.tick_math',
+    'get_tick_at_sqrt_ratio': '.tick_math',
+    'get_sqrt_ratio_at_tick': '.tick_math',
+}
 
 # Optional: اگر ماژول‌های دیگری دارید می‌توانید آنها را هم اضافه کنید
 # from .price_utils import get_predicted_price, calculate_tick_range
@@ -15,6 +23,18 @@ __all__ = [
     'get_contract',
     'send_transaction',
     'wrap_eth_to_weth',
+    'aggregate3',
+    'price_to_tick',
+    'get_tick_at_sqrt_ratio',
+    'get_sqrt_ratio_at_tick',
     # 'get_predicted_price',
     # 'calculate_tick_range'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
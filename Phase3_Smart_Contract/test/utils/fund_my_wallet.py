@@ -8,10 +8,11 @@ import os
 import sys
 import logging
 import requests
+from pathlib import Path
 from time import sleep
 from web3 import Web3, HTTPProvider
 from web3.exceptions import ContractLogicError, TransactionNotFound
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 # --- Constants ---
 DEFAULT_RPC_URL = "http://127.0.0.1:8545"
@@ -68,29 +69,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger('wallet_funder')
 
+# Imported after the logging setup above, so web3_utils' basicConfig fallback leaves our handlers alone
+project_root = Path(__file__).resolve().parent.parent.parent # test/utils/fund_my_wallet.py -> Phase3_Smart_Contract
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+from test.utils.web3_utils import build_http_session
+
+# One keep-alive connection pool shared by web3 and the raw hardhat_* RPC requests
+_http_session = build_http_session()
+
 class WalletFunder:
     def __init__(self):
         """Initialize with Web3 connection and deployer address."""
         self.rpc_url = os.getenv('MAINNET_FORK_RPC_URL', DEFAULT_RPC_URL)
-        logger.info(f"Initializing Web3 connection to {self.rpc_url}")
+        logger.info("Initializing Web3 connection to %s", self.rpc_url)
         self.w3 = self._init_web3()
         self.deployer_address = self._get_deployer_address()
-        logger.info(f"Using deployer address: {self.deployer_address}")
+        logger.info("Using deployer address: %s", self.deployer_address)
 
     def _init_web3(self) -> Web3:
         """Initialize and verify Web3 connection."""
         for attempt in range(MAX_RETRIES):
             try:
-                w3 = Web3(HTTPProvider(self.rpc_url, request_kwargs={'timeout': 60}))
+                w3 = Web3(HTTPProvider(self.rpc_url, request_kwargs={'timeout': 60}, session=_http_session))
                 
                 # Verify connection
                 if w3.is_connected():
-                    logger.info(f"Connected to chain ID: {w3.eth.chain_id}")
+                    logger.info("Connected to chain ID: %s", w3.eth.chain_id)
                     return w3
                 raise ConnectionError("Web3 not connected")
                 
             except Exception as e:
-                logger.error(f"Connection attempt {attempt + 1} failed: {str(e)}")
+                logger.error("Connection attempt %s failed: %s", attempt + 1, str(e))
                 if attempt == MAX_RETRIES - 1:
                     logger.critical("Failed to connect to Web3 provider")
                     sys.exit(1)
@@ -107,7 +117,7 @@ class WalletFunder:
         try:
             return self.w3.to_checksum_address(address)
         except ValueError as e:
-            logger.critical(f"Invalid address format: {str(e)}")
+            logger.critical("Invalid address format: %s", str(e))
             sys.exit(1)
 
     def make_rpc_request(self, method: str, params: list) -> Optional[Dict]:
@@ -121,7 +131,7 @@ class WalletFunder:
         
         for attempt in range(MAX_RETRIES):
             try:
-                response = requests.post(
+                response = _http_session.post(
                     self.rpc_url,
                     json=payload,
                     timeout=60
@@ -130,12 +140,12 @@ class WalletFunder:
                 result = response.json()
                 
                 if 'error' in result:
-                    logger.error(f"RPC error: {result['error']}")
+                    logger.error("RPC error: %s", result['error'])
                     return None
                 return result.get('result')
                 
             except requests.exceptions.RequestException as e:
-                logger.error(f"Request failed (attempt {attempt + 1}): {str(e)}")
+                logger.error("Request failed (attempt %s): %s", attempt + 1, str(e))
                 if attempt == MAX_RETRIES - 1:
                     return None
                 sleep(RETRY_DELAY)
@@ -147,7 +157,7 @@ class WalletFunder:
             checksum_addr = self.w3.to_checksum_address(address)
             wei_amount = self.w3.to_wei(eth_amount, 'ether')
             
-            logger.info(f"Setting balance for {checksum_addr[:10]}... to {eth_amount} ETH")
+            logger.info("Setting balance for %s... to %s ETH", checksum_addr[:10], eth_amount)
             
             result = self.make_rpc_request(
                 "hardhat_setBalance",
@@ -161,14 +171,14 @@ class WalletFunder:
             # Verify new balance
             new_balance = self.w3.eth.get_balance(checksum_addr)
             if new_balance >= wei_amount:
-                logger.info(f"✅ New balance: {self.w3.from_wei(new_balance, 'ether')} ETH")
+                logger.info("✅ New balance: %s ETH", self.w3.from_wei(new_balance, 'ether'))
                 return True
             else:
-                logger.error(f"Balance verification failed")
+                logger.error("Balance verification failed")
                 return False
                 
         except Exception as e:
-            logger.error(f"Error setting balance: {str(e)}")
+            logger.error("Error setting balance: %s", str(e))
             return False
 
     def transfer_tokens(self, token_symbol: str, token_config: Dict[str, Any]) -> bool:
@@ -179,27 +189,31 @@ class WalletFunder:
             whale_addr = self.w3.to_checksum_address(token_config['whale'])
             amount = int(token_config['amount'] * (10 ** token_config['decimals']))
             
-            logger.info(f"\n=== Processing {token_symbol} transfer ===")
+            logger.info("\n=== Processing %s transfer ===", token_symbol)
             
             # 1. Impersonate whale
             if not self._impersonate_account(whale_addr):
                 return False
                 
-            # 2. Fund whale with ETH for gas
-            if not self._ensure_eth_balance(whale_addr, MIN_ETH_BALANCE):
+            # 2. Whale ETH and token balances in one JSON-RPC batch
+            whale_eth_balance, whale_token_balance = self._whale_balances(token_addr, whale_addr)
+
+            # 3. Fund whale with ETH for gas
+            if not self._ensure_eth_balance(whale_addr, MIN_ETH_BALANCE, whale_eth_balance):
                 return False
                 
-            # 3. Execute token transfer
+            # 4. Execute token transfer
             return self._execute_token_transfer(
                 token_symbol,
                 token_addr,
                 whale_addr,
                 amount,
-                token_config['decimals']
+                token_config['decimals'],
+                whale_token_balance
             )
             
         except Exception as e:
-            logger.error(f"Transfer failed: {str(e)}")
+            logger.error("Transfer failed: %s", str(e))
             return False
         finally:
             if whale_addr:
@@ -207,37 +221,53 @@ class WalletFunder:
 
     def _impersonate_account(self, address: str) -> bool:
         """Impersonate an account."""
-        logger.info(f"Impersonating {address[:10]}...")
+        logger.info("Impersonating %s...", address[:10])
         result = self.make_rpc_request("hardhat_impersonateAccount", [address])
         return result is not None
 
     def _stop_impersonating_account(self, address: str) -> bool:
         """Stop impersonating an account."""
-        logger.info(f"Stopping impersonation of {address[:10]}...")
+        logger.info("Stopping impersonation of %s...", address[:10])
         result = self.make_rpc_request("hardhat_stopImpersonatingAccount", [address])
         return result is not None
 
-    def _ensure_eth_balance(self, address: str, min_eth: float) -> bool:
+    def _whale_balances(self, token_addr: str, whale_addr: str) -> Tuple[Optional[int], Optional[int]]:
+        """Whale's ETH and token balance in one batch; (None, None) if the node rejects batches."""
+        token_contract = self.w3.eth.contract(address=token_addr, abi=ERC20_ABI)
+        try:
+            with self.w3.batch_requests() as batch:
+                batch.add(self.w3.eth.get_balance(whale_addr))
+                batch.add(token_contract.functions.balanceOf(whale_addr))
+                eth_balance, token_balance = batch.execute()
+            return eth_balance, token_balance
+        except Exception as e:
+            logger.warning("Batched balance read failed (%s); reading balances one by one", e)
+            return None, None
+
+    def _ensure_eth_balance(self, address: str, min_eth: float, current_balance: Optional[int] = None) -> bool:
         """Ensure address has sufficient ETH."""
         min_wei = self.w3.to_wei(min_eth, 'ether')
-        current_balance = self.w3.eth.get_balance(address)
+        if current_balance is None:
+            current_balance = self.w3.eth.get_balance(address)
         
         if current_balance >= min_wei:
-            logger.info(f"Account has sufficient ETH")
+            logger.info("Account has sufficient ETH")
             return True
             
         funding_amount = max(min_eth, 1.0)
-        logger.info(f"Funding with {funding_amount} ETH...")
+        logger.info("Funding with %s ETH...", funding_amount)
         return self.set_eth_balance(address, funding_amount)
 
     def _execute_token_transfer(self, token_symbol: str, token_addr: str, 
-                              whale_addr: str, amount_wei: int, decimals: int) -> bool:
+                              whale_addr: str, amount_wei: int, decimals: int,
+                              whale_balance: Optional[int] = None) -> bool:
         """Execute token transfer."""
         try:
             token_contract = self.w3.eth.contract(address=token_addr, abi=ERC20_ABI)
             
             # Check balance
-            whale_balance = token_contract.functions.balanceOf(whale_addr).call()
+            if whale_balance is None:
+                whale_balance = token_contract.functions.balanceOf(whale_addr).call()
             if whale_balance < amount_wei:
                 logger.error("Insufficient token balance")
                 return False
@@ -259,7 +289,7 @@ class WalletFunder:
                 ).estimate_gas({'from': whale_addr})
                 tx_data['gas'] = int(gas_estimate * GAS_BUFFER)
             except Exception as e:
-                logger.error(f"Gas estimation failed: {str(e)}")
+                logger.error("Gas estimation failed: %s", str(e))
                 return False
                 
             # Send transaction
@@ -286,7 +316,7 @@ class WalletFunder:
                 return False
                 
         except Exception as e:
-            logger.error(f"Transfer execution failed: {str(e)}")
+            logger.error("Transfer execution failed: %s", str(e))
             return False
 
 def main():
@@ -305,9 +335,9 @@ def main():
         # Transfer tokens
         logger.info("\n[2/2] Transferring tokens...")
         for symbol, config in TOKEN_CONFIG.items():
-            logger.info(f"\nProcessing {symbol}...")
+            logger.info("\nProcessing %s...", symbol)
             if not funder.transfer_tokens(symbol, config):
-                logger.error(f"{symbol} transfer failed")
+                logger.error("%s transfer failed", symbol)
                 success = False
         
         if success:
@@ -318,7 +348,7 @@ def main():
             sys.exit(1)
             
     except Exception as e:
-        logger.critical(f"Fatal error: {str(e)}")
+        logger.critical("Fatal error: %s", str(e))
         sys.exit(1)
 
 if __name__ == "__main__":
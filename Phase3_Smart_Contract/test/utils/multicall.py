@@ -0,0 +1,179 @@
+import logging
+import functools
+from eth_utils import function_signature_to_4byte_selector
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+from web3 import Web3
+# Import the web3_utils module itself to access its w3 instance
+import test.utils.web3_utils as web3_utils
+
+logger = logging.getLogger('multicall')
+
+# --- Multicall3 (deployed at the same address on mainnet and its forks) ---
+MULTICALL3_ADDRESS = Web3.to_checksum_address("0xcA11bde05977b3631167028862bE2a173976CA11")
+AGGREGATE3_SELECTOR = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+BALANCE_OF_SELECTOR = Web3.keccak(text="balanceOf(address)")[:4]
+
+
+@functools.lru_cache(maxsize=None)
+def balance_of_calldata(holder):
+    """ABI-encoded balanceOf(holder) calldata, built once per holder address."""
+    return BALANCE_OF_SELECTOR + bytes(12) + bytes.fromhex(holder[2:])
+
+
+_output_types_cache = {} # (contract address, function signature) -> collapsed output types
+
+
+@functools.lru_cache(maxsize=None)
+def _selector_calldata(signature):
+    """Calldata of a no-argument function: just its 4-byte selector, computed once per signature."""
+    return HexBytes(function_signature_to_4byte_selector(signature))
+
+
+def _calldata(contract_fn):
+    """Encoded calldata of a bound contract function; no-argument views skip the ABI encoder."""
+    if not contract_fn.args and not contract_fn.kwargs:
+        return _selector_calldata(contract_fn.signature)
+    return HexBytes(contract_fn._encode_transaction_data())
+
+
+def _output_types(contract_fn):
+    """ABI output types of a bound contract function, tuples collapsed for the codec (cached per function)."""
+    key = (contract_fn.address, contract_fn.signature)
+    output_types = _output_types_cache.get(key)
+    if output_types is None:
+        output_types = _output_types_cache[key] = tuple(
+            collapse_if_tuple(output) for output in contract_fn.abi.get('outputs', [])
+        )
+    return output_types
+
+
+def _normalize_result(output_types, values):
+    """Shape decoded values like ContractFunction.call() does."""
+    values = tuple(
+        Web3.to_checksum_address(value) if output_type == 'address' else value
+        for output_type, value in zip(output_types, values)
+    )
+    return values[0] if len(values) == 1 else values
+
+
+def _call_single(contract_fn, allow_failure, block_identifier):
+    """Plain eth_call for one function, honouring allow_failure like aggregate3 does."""
+    try:
+        return contract_fn.call(block_identifier=block_identifier)
+    except Exception:
+        if allow_failure:
+            return None
+        raise
+
+
+def aggregate3_raw(raw_calls, allow_failure=False, block_identifier='latest'):
+    """
+    Multicall3.aggregate3 over pre-encoded `(target, calldata)` pairs.
+    Returns the raw return data per call (None for a failed call when `allow_failure` is set),
+    falling back to one eth_call per pair if the aggregate call itself fails.
+    """
+    w3 = web3_utils.w3
+    if not w3:
+        raise ConnectionError("Web3 is not initialized for multicall.")
+    if not raw_calls:
+        return []
+
+    calls = [(target, allow_failure, calldata) for target, calldata in raw_calls]
+    try:
+        calldata = AGGREGATE3_SELECTOR + w3.codec.encode(['(address,bool,bytes)[]'], [calls])
+        raw = w3.eth.call({'to': MULTICALL3_ADDRESS, 'data': calldata}, block_identifier)
+        (results,) = w3.codec.decode(['(bool,bytes)[]'], raw)
+    except Exception as e:
+        logger.warning("Multicall3 aggregate3 failed (%s). Falling back to %s sequential calls.", e, len(raw_calls))
+        return [_call_raw_single(w3, target, calldata, allow_failure, block_identifier) for target, calldata in raw_calls]
+    return [return_data if success else None for success, return_data in results]
+
+
+def _call_raw_single(w3, target, calldata, allow_failure, block_identifier):
+    """Plain eth_call for one pre-encoded call, honouring allow_failure like aggregate3 does."""
+    try:
+        return w3.eth.call({'to': target, 'data': calldata}, block_identifier)
+    except Exception:
+        if allow_failure:
+            return None
+        raise
+
+
+def erc20_balances(token_holder_pairs, block_identifier='latest'):
+    """balanceOf for each `(token, holder)` pair in one Multicall3 call, using cached calldata."""
+    raw_results = aggregate3_raw(
+        [(token, balance_of_calldata(holder)) for token, holder in token_holder_pairs],
+        block_identifier=block_identifier,
+    )
+    return [int.from_bytes(return_data[:32], 'big') for return_data in raw_results]
+
+
+def aggregate3(contract_calls, allow_failure=False, block_identifier='latest'):
+    """
+    Execute several view calls in a single eth_call through Multicall3.aggregate3.
+
+    `contract_calls` is a list of bound contract functions (e.g. `pool.functions.slot0()`).
+    Returns the decoded results in the same order, shaped like `.call()` would return them.
+    A failed call yields None when `allow_failure` is set. If the aggregate call itself
+    fails (no Multicall3 on the node, or a reverting call), falls back to sequential calls.
+    """
+    w3 = web3_utils.w3
+    if not w3:
+        raise ConnectionError("Web3 is not initialized for multicall.")
+    if not contract_calls:
+        return []
+
+    calls = [(fn.address, allow_failure, _calldata(fn)) for fn in contract_calls]
+    try:
+        calldata = AGGREGATE3_SELECTOR + w3.codec.encode(['(address,bool,bytes)[]'], [calls])
+        raw = w3.eth.call({'to': MULTICALL3_ADDRESS, 'data': calldata}, block_identifier)
+        (results,) = w3.codec.decode(['(bool,bytes)[]'], raw)
+    except Exception as e:
+        logger.warning("Multicall3 aggregate3 failed (%s). Falling back to %s sequential calls.", e, len(contract_calls))
+        return [_call_single(fn, allow_failure, block_identifier) for fn in contract_calls]
+
+    decoded = []
+    for fn, (success, return_data) in zip(contract_calls, results):
+        if not success:
+            decoded.append(None)
+            continue
+        output_types = _output_types(fn)
+        decoded.append(_normalize_result(output_types, w3.codec.decode(output_types, return_data)))
+    return decoded
+
+
+# --- Pool state straight from storage ---
+def decode_slot0_word(raw):
+    """
+    Split the packed UniswapV3Pool slot0 storage word (slot 0) into (sqrtPriceX96, tick, observationIndex).
+    Packing, low bits first: uint160 sqrtPriceX96 | int24 tick | uint16 observationIndex | ...
+    """
+    raw = bytes(raw).rjust(32, b'\0')
+    sqrt_price_x96 = int.from_bytes(raw[12:32], 'big')
+    tick = int.from_bytes(raw[9:12], 'big', signed=True)
+    observation_index = int.from_bytes(raw[7:9], 'big')
+    return sqrt_price_x96, tick, observation_index
+
+
+def read_slot0_and_call(pool_address, contract_fn, block_identifier='latest'):
+    """
+    Read a pool's slot0 via eth_getStorageAt (no EVM execution) together with one view call,
+    in a single JSON-RPC batch. Returns ((sqrtPriceX96, tick, observationIndex), call result).
+    `contract_fn` may be None, in which case only slot0 is read.
+    """
+    w3 = web3_utils.w3
+    if not w3:
+        raise ConnectionError("Web3 is not initialized for batched reads.")
+    if contract_fn is None:
+        return decode_slot0_word(w3.eth.get_storage_at(pool_address, 0, block_identifier)), None
+    try:
+        with w3.batch_requests() as batch:
+            batch.add(w3.eth.get_storage_at(pool_address, 0, block_identifier))
+            batch.add(contract_fn.call(block_identifier=block_identifier))
+            raw_slot0, result = batch.execute()
+    except Exception as e:
+        logger.warning("JSON-RPC batch failed (%s). Falling back to sequential reads.", e)
+        raw_slot0 = w3.eth.get_storage_at(pool_address, 0, block_identifier)
+        result = contract_fn.call(block_identifier=block_identifier)
+    return decode_slot0_word(raw_slot0), result
@@ -1,16 +1,67 @@
 import os
+import csv
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
 from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
 from web3 import Web3
 from decimal import Decimal
 # Import the web3_utils module itself to access its w3 instance and functions
 import test.utils.web3_utils as web3_utils
+from test.utils.multicall import aggregate3, erc20_balances
 
 logger = logging.getLogger('test_base')
 
+def queued_logger(name: str, log_file: str) -> logging.Logger:
+    """
+    Logger for a test script: records go through a queue to a background listener thread that writes
+    them to log_file (in the execution directory) and the console, so logging never blocks the test loop.
+    Guarded so re-imports don't attach a second listener.
+    """
+    test_logger = logging.getLogger(name)
+    if test_logger.handlers:
+        return test_logger
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    stream_handler = logging.StreamHandler()
+    file_handler.setFormatter(formatter)
+    stream_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    atexit.register(listener.stop) # Drains queued records before logging shuts down
+    test_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    test_logger.setLevel(logging.INFO)
+    test_logger.propagate = False # The listener already writes to the console
+    return test_logger
+
+# Adjustment txs skip estimate_gas: limit is 1.5x the largest gasUsed learned so far, or the default
+DEFAULT_ADJUST_GAS = 1_500_000
+ADJUST_GAS_HEADROOM = 1.5
+
+# Position views in lookup order, each with the field order of the tuple it returns
+_POSITION_VIEWS = (
+    ('getCurrentPosition', ('tokenId', 'active', 'tickLower', 'tickUpper', 'liquidity')), # BaselineMinimal
+    ('currentPosition', ('tokenId', 'liquidity', 'tickLower', 'tickUpper', 'active')), # PredictiveLiquidityManager
+)
+
 class LiquidityTestBase(ABC):
     """Base class for liquidity position testing."""
 
+    # Results file layout, set per subclass: where rows go, column order, per-cycle defaults
+    RESULTS_FILE: Path | None = None
+    CSV_COLUMNS: tuple[str, ...] = ()
+    METRICS_TEMPLATE: tuple[tuple[str, object], ...] = ()
+    # Rows go through a 64 KiB buffer, flushed to disk every N rows or T seconds (and at exit)
+    CSV_FLUSH_EVERY_ROWS = 10
+    CSV_FLUSH_EVERY_SECONDS = 300.0
+    # Where the learned adjustment gasUsed is kept between runs, set per subclass (None = not persisted)
+    GAS_CAP_FILE: Path | None = None
+
     def __init__(self, contract_address: str, contract_name: str):
         """Initialize test with contract info."""
         if not contract_address:
@@ -22,6 +73,25 @@ class LiquidityTestBase(ABC):
         self.token1 = None
         self.token0_decimals = None
         self.token1_decimals = None
+        # Decimals adjustment factors, fixed once decimals are known in setup()
+        self._dec_diff = None
+        self._price_num_scale = None
+        self._price_den_scale = None
+        # Bound position view call, resolved once per contract (False = not looked up yet)
+        self._position_fn = False
+        self._position_fields = None
+        # One metrics dict per test, reset from METRICS_TEMPLATE every cycle
+        self.metrics = {}
+        self._reset_metrics()
+        # Results file is opened on the first save and kept open for the rest of the run
+        self._csv_fh = None
+        self._csv_writer = None
+        self._csv_rows_unflushed = 0
+        self._csv_flushed_at = 0.0
+        self._adjust_gas_used = web3_utils.load_learned_gas(self.GAS_CAP_FILE) if self.GAS_CAP_FILE else None
+        # Deployer account (set by the subclass) and its local nonce counter; None = re-sync from the node
+        self.account = None
+        self._nonce = None
         # self.w3 will now be web3_utils.w3
 
     def setup(self) -> bool:
@@ -33,36 +103,46 @@ class LiquidityTestBase(ABC):
                 return False
             
             # Ensure the w3 instance in web3_utils is usable
-            if not web3_utils.w3 or not web3_utils.w3.is_connected():
+            if not web3_utils.w3:
                  logger.error("web3_utils.w3 is not available or not connected after init_web3 call.")
                  return False
 
 
-            logger.info(f"Setting up test for {self.contract_name} at {self.contract_address}")
+            logger.info("Setting up test for %s at %s", self.contract_name, self.contract_address)
             # Load main contract using get_contract from web3_utils (which uses web3_utils.w3)
             self.contract = web3_utils.get_contract(self.contract_address, self.contract_name)
             if not self.contract:
-                logger.error(f"Failed to load contract {self.contract_name}")
+                logger.error("Failed to load contract %s", self.contract_name)
                 return False
+            self._position_fn = False
 
-            self.token0 = Web3.to_checksum_address(self.contract.functions.token0().call())
-            self.token1 = Web3.to_checksum_address(self.contract.functions.token1().call())
+            # Two Multicall3 round-trips: the token pair, then both decimals
+            self.token0, self.token1 = aggregate3([self.contract.functions.token0(), self.contract.functions.token1()])
 
             # Get decimals
             token0_contract = web3_utils.get_contract(self.token0, "IERC20")
-            self.token0_decimals = token0_contract.functions.decimals().call()
-
             token1_contract = web3_utils.get_contract(self.token1, "IERC20")
-            self.token1_decimals = token1_contract.functions.decimals().call()
+            self.token0_decimals, self.token1_decimals = aggregate3([
+                token0_contract.functions.decimals(),
+                token1_contract.functions.decimals(),
+            ])
+
+            # Token decimals never change, so fold them into the price scale once
+            self._dec_diff = self.token0_decimals - self.token1_decimals
+            # price = sqrtPriceX96**2 * 10**(dec1 - dec0) / 2**192, kept as an exact int ratio
+            if self._dec_diff <= 0:
+                self._price_num_scale, self._price_den_scale = 10 ** -self._dec_diff, 1 << 192
+            else:
+                self._price_num_scale, self._price_den_scale = 1, (1 << 192) * 10 ** self._dec_diff
 
-            logger.info(f"Token0: {self.token0} (Decimals: {self.token0_decimals})")
-            logger.info(f"Token1: {self.token1} (Decimals: {self.token1_decimals})")
+            logger.info("Token0: %s (Decimals: %s), Token1: %s (Decimals: %s)",
+                        self.token0, self.token0_decimals, self.token1, self.token1_decimals)
             
-            logger.info(f"Setup completed for {self.contract_name}")
+            logger.info("Setup completed for %s", self.contract_name)
             return True
 
         except Exception as e:
-            logger.exception(f"Setup failed for {self.contract_name} at {self.contract_address}: {e}")
+            logger.exception("Setup failed for %s at %s: %s", self.contract_name, self.contract_address, e)
             return False
 
     def check_balances(self) -> bool:
@@ -70,24 +150,24 @@ class LiquidityTestBase(ABC):
         if not self.contract or not self.token0 or not self.token1:
             logger.error("Contract or tokens not initialized. Run setup first.")
             return False
-        if not web3_utils.w3 or not web3_utils.w3.is_connected():
+        if not web3_utils.w3:
             logger.error("Web3 not connected in check_balances.")
             return False
         try:
-            token0_contract = web3_utils.get_contract(self.token0, "IERC20")
-            token1_contract = web3_utils.get_contract(self.token1, "IERC20")
-
-            balance0_wei = token0_contract.functions.balanceOf(self.contract_address).call()
-            balance1_wei = token1_contract.functions.balanceOf(self.contract_address).call()
+            # Both balances in one Multicall3 eth_call
+            balance0_wei, balance1_wei = erc20_balances([
+                (self.token0, self.contract_address),
+                (self.token1, self.contract_address),
+            ])
 
             readable_balance0 = Decimal(balance0_wei) / (10 ** self.token0_decimals)
             readable_balance1 = Decimal(balance1_wei) / (10 ** self.token1_decimals)
 
-            logger.info(f"Contract Token0 ({self.token0[-6:]}) balance: {readable_balance0:.6f}")
-            logger.info(f"Contract Token1 ({self.token1[-6:]}) balance: {readable_balance1:.6f}")
+            logger.info("Contract Token0 (%s) balance: %.6f, Token1 (%s) balance: %.6f",
+                        self.token0[-6:], readable_balance0, self.token1[-6:], readable_balance1)
             return True
         except Exception as e:
-            logger.exception(f"Balance check failed: {e}")
+            logger.exception("Balance check failed: %s", e)
             return False
 
     @abstractmethod
@@ -95,10 +175,63 @@ class LiquidityTestBase(ABC):
         """Abstract method for adjusting the position. Implement in derived class."""
         pass
 
-    @abstractmethod
+    def _reset_metrics(self):
+        """Reset the per-cycle metrics in place (the same dict is reused for every cycle)."""
+        self.metrics.clear()
+        self.metrics.update(self.METRICS_TEMPLATE)
+        return self.metrics
+
+    def _next_nonce(self) -> int:
+        """Nonce for the next deployer tx, read from the node (pending) only when the counter is unknown."""
+        if self._nonce is None:
+            self._nonce = web3_utils.w3.eth.get_transaction_count(self.account.address, 'pending')
+        return self._nonce
+
+    def _adjust_gas_limit(self) -> int:
+        """Gas limit for the next adjustment tx, from the learned gasUsed cap."""
+        if self._adjust_gas_used:
+            return int(self._adjust_gas_used * ADJUST_GAS_HEADROOM)
+        return DEFAULT_ADJUST_GAS
+
+    def _learn_adjust_gas(self, receipt, gas_limit: int):
+        """Raise the learned cap after a successful adjustment; drop it when a revert used the whole limit."""
+        gas_used = receipt.get('gasUsed', 0)
+        if receipt.status == 1:
+            if gas_used > (self._adjust_gas_used or 0):
+                self._adjust_gas_used = gas_used
+                if self.GAS_CAP_FILE:
+                    web3_utils.store_learned_gas(self.GAS_CAP_FILE, gas_used)
+        elif gas_used >= gas_limit:
+            # Ran out of gas under the learned cap: forget it and use the default next time
+            logger.warning("%s adjustment used its whole gas limit; resetting the learned gas cap.", self.contract_name)
+            self._adjust_gas_used = None
+            if self.GAS_CAP_FILE:
+                web3_utils.store_learned_gas(self.GAS_CAP_FILE, None)
+
     def save_metrics(self):
-        """Abstract method for saving metrics. Implement in derived class."""
-        pass
+        """Append the current metrics as one row of RESULTS_FILE, writing the header if the file is new."""
+        self.metrics['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            if self._csv_writer is None:
+                # Open the results file once and keep appending to it for the rest of the run
+                self.RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+                self._csv_fh = open(self.RESULTS_FILE, 'a', newline='', buffering=1 << 16, encoding='utf-8')
+                atexit.register(self._csv_fh.close) # close() flushes whatever is still buffered
+                self._csv_writer = csv.writer(self._csv_fh)
+                if os.fstat(self._csv_fh.fileno()).st_size == 0:
+                    self._csv_writer.writerow(self.CSV_COLUMNS)
+                self._csv_flushed_at = time.monotonic()
+            # metrics always holds every column (see METRICS_TEMPLATE); csv.writer writes None as ""
+            self._csv_writer.writerow(map(self.metrics.get, self.CSV_COLUMNS))
+            self._csv_rows_unflushed += 1
+            now = time.monotonic()
+            if self._csv_rows_unflushed >= self.CSV_FLUSH_EVERY_ROWS or now - self._csv_flushed_at >= self.CSV_FLUSH_EVERY_SECONDS:
+                self._csv_fh.flush()
+                self._csv_rows_unflushed = 0
+                self._csv_flushed_at = now
+            logger.info("%s metrics saved to %s", self.contract_name, self.RESULTS_FILE)
+        except (OSError, csv.Error) as e:
+            logger.error("Failed to save %s metrics: %s", self.contract_name, e, exc_info=logger.isEnabledFor(logging.DEBUG))
 
     def execute_test_steps(self) -> bool:
         """Execute all test steps sequentially."""
@@ -123,7 +256,7 @@ class LiquidityTestBase(ABC):
             logger.info("--- All test steps completed successfully ---")
             return True
         except Exception as e:
-            logger.exception(f"Test execution failed during steps: {e}")
+            logger.exception("Test execution failed during steps: %s", e)
             try:
                 if hasattr(self, 'metrics') and self.metrics:
                     if hasattr(self, 'ACTION_STATES') and "UNEXPECTED_ERROR" in self.ACTION_STATES:
@@ -131,7 +264,7 @@ class LiquidityTestBase(ABC):
                     self.metrics['error_message'] = self.metrics.get('error_message', f"Test Execution Aborted: {str(e)}")
                     self.save_metrics()
             except Exception as save_err:
-                logger.error(f"Also failed to save metrics during exception handling: {save_err}")
+                logger.error("Also failed to save metrics during exception handling: %s", save_err)
             return False
 
     def get_position_info(self) -> dict | None:
@@ -139,40 +272,45 @@ class LiquidityTestBase(ABC):
         if not self.contract:
             logger.error("Contract not initialized. Run setup first.")
             return None
-        if not web3_utils.w3 or not web3_utils.w3.is_connected():
+        if not web3_utils.w3:
             logger.error("Web3 not connected in get_position_info.")
             return None
         try:
-            pos_data = None
-            if hasattr(self.contract.functions, 'getPositionState'):
-                 pass 
-            
-            if hasattr(self.contract.functions, 'getCurrentPosition'):
-                pos_data = self.contract.functions.getCurrentPosition().call()
-            elif hasattr(self.contract.functions, 'currentPosition'):
-                pos_data = self.contract.functions.currentPosition().call()
-            else:
-                logger.error(f"No known position info method (getCurrentPosition, currentPosition) found on contract {self.contract_name}")
-                return None
-
-            if pos_data and len(pos_data) == 5:
-                 position = {
-                    'tokenId': pos_data[0],
-                    'liquidity': pos_data[1],
-                    'tickLower': pos_data[2],
-                    'tickUpper': pos_data[3],
-                    'active': pos_data[4]
-                }
-                 logger.debug(f"Fetched Position Info: {position}")
-                 return position
-            else:
-                logger.error(f"Position data format unexpected or not found. Data: {pos_data}")
+            position_fn = self._position_function()
+            if position_fn is None:
                 return None
+            return self._parse_position(position_fn.call())
 
         except Exception as e:
-            logger.exception(f"Failed to get position info from contract {self.contract_name}: {e}")
+            logger.exception("Failed to get position info from contract %s: %s", self.contract_name, e)
             return None
 
+    def _position_function(self):
+        """Return the bound view call that reads the current position, or None if the contract has none."""
+        if self._position_fn is False:
+            # No-argument calls are reusable, so the ABI lookup and binding happen once per contract
+            self._position_fn = None
+            for fn_name, fields in _POSITION_VIEWS:
+                if hasattr(self.contract.functions, fn_name):
+                    self._position_fn = self.contract.functions[fn_name]()
+                    self._position_fields = fields
+                    break
+            else:
+                logger.error("No known position info method (%s) found on contract %s",
+                             ", ".join(fn_name for fn_name, _ in _POSITION_VIEWS), self.contract_name)
+        return self._position_fn
+
+    def _parse_position(self, pos_data) -> dict | None:
+        """Convert raw position data into a dict, using the field order of the contract's position view."""
+        if self._position_fields is None:
+            self._position_function()
+        if pos_data and self._position_fields and len(pos_data) == len(self._position_fields):
+            position = dict(zip(self._position_fields, pos_data))
+            logger.debug("Fetched Position Info: %s", position)
+            return position
+        logger.error("Position data format unexpected or not found. Data: %s", pos_data)
+        return None
+
     def _calculate_actual_price(self, sqrt_price_x96: int) -> float:
         """
         Calculates the human-readable price from a sqrtPriceX96 value.
@@ -180,16 +318,13 @@ class LiquidityTestBase(ABC):
         """
         if not sqrt_price_x96 or sqrt_price_x96 == 0:
             return 0.0
-        if self.token0_decimals is None or self.token1_decimals is None:
+        if self._price_den_scale is None:
             logger.error("Token decimals not set, cannot calculate actual price.")
             return 0.0
 
-        TWO_POW_96 = Decimal(2**96)
         try:
-            sqrt_price_x96_dec = Decimal(sqrt_price_x96)
-            price_ratio_token1_token0 = (sqrt_price_x96_dec / TWO_POW_96)**2
-            adjusted_price = price_ratio_token1_token0 * (Decimal(10)**(self.token1_decimals - self.token0_decimals))
-            return float(adjusted_price)
+            # Integer numerator/denominator; int / int is a single correctly rounded float division
+            return (sqrt_price_x96 * sqrt_price_x96 * self._price_num_scale) / self._price_den_scale
         except Exception as e:
-            logger.exception(f"Error calculating actual price from sqrtPriceX96={sqrt_price_x96}: {e}")
+            logger.exception("Error calculating actual price from sqrtPriceX96=%s: %s", sqrt_price_x96, e)
             return 0.0
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Reference checks for the exact TickMath port and the slot0 storage decoder.
+Run with: python -m pytest -q test/utils/test_pool_math.py (from Phase3_Smart_Contract)
+"""
+import pytest
+
+from test.utils.tick_math import (MIN_TICK, MAX_TICK, MIN_SQRT_RATIO, MAX_SQRT_RATIO, get_sqrt_ratio_at_tick,
+                                  get_tick_at_sqrt_ratio, price_to_tick, price_to_tick_exact)
+from test.utils.multicall import decode_slot0_word
+
+# sqrtPriceX96 values from Uniswap V3 TickMath (constants and its test vectors)
+REFERENCE_SQRT_RATIOS = {
+    MIN_TICK: 4295128739,
+    -1: 79224201403219477170569942574,
+    0: 79228162514264337593543950336, # 2**96
+    1: 79232123823359799118286999568,
+    MAX_TICK: 1461446703485210103287273052203988822378723970342,
+}
+
+
+def test_min_max_sqrt_ratio_constants():
+    assert MIN_SQRT_RATIO == REFERENCE_SQRT_RATIOS[MIN_TICK]
+    assert MAX_SQRT_RATIO == REFERENCE_SQRT_RATIOS[MAX_TICK]
+
+
+@pytest.mark.parametrize('tick, expected', sorted(REFERENCE_SQRT_RATIOS.items()))
+def test_get_sqrt_ratio_at_tick_reference_values(tick, expected):
+    assert get_sqrt_ratio_at_tick(tick) == expected
+
+
+@pytest.mark.parametrize('tick', [MIN_TICK, MIN_TICK + 1, -1, 0, 1, MAX_TICK - 1])
+def test_tick_sqrt_ratio_round_trip(tick):
+    sqrt_ratio = get_sqrt_ratio_at_tick(tick)
+    assert get_tick_at_sqrt_ratio(sqrt_ratio) == tick
+    # One below a tick's ratio already belongs to the tick under it
+    if tick > MIN_TICK:
+        assert get_tick_at_sqrt_ratio(sqrt_ratio - 1) == tick - 1
+
+
+def test_get_tick_at_sqrt_ratio_upper_edge():
+    # MAX_SQRT_RATIO itself is excluded, as on-chain; the ratio just under it is still MAX_TICK - 1
+    assert get_tick_at_sqrt_ratio(MAX_SQRT_RATIO - 1) == MAX_TICK - 1
+    with pytest.raises(ValueError):
+        get_tick_at_sqrt_ratio(MAX_SQRT_RATIO)
+    with pytest.raises(ValueError):
+        get_tick_at_sqrt_ratio(MIN_SQRT_RATIO - 1)
+
+
+def test_get_sqrt_ratio_at_tick_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        get_sqrt_ratio_at_tick(MAX_TICK + 1)
+    with pytest.raises(ValueError):
+        get_sqrt_ratio_at_tick(MIN_TICK - 1)
+
+
+@pytest.mark.parametrize('price, dec0, dec1, expected', [
+    (1.0, 18, 18, 0),
+    (1.0001 ** 10, 18, 18, 9), # float pow lands a hair under the boundary of tick 10
+    (0.5, 18, 18, -6932),
+    (2000.0, 18, 6, 352336), # WETH/USDC-style decimals
+    (1e-300, 18, 18, MIN_TICK), # clamped like price_to_tick
+    (1e300, 18, 18, MAX_TICK),
+])
+def test_price_to_tick_exact(price, dec0, dec1, expected):
+    assert price_to_tick_exact(price, dec0, dec1) == expected
+
+
+@pytest.mark.parametrize('price, dec0, dec1', [(0.5, 18, 18), (2000.0, 18, 6), (3.7e-4, 6, 18), (1234.5678, 8, 8)])
+def test_price_to_tick_exact_agrees_off_boundary(price, dec0, dec1):
+    assert price_to_tick_exact(price, dec0, dec1) == price_to_tick(price, dec0, dec1)
+
+
+def _slot0_word(sqrt_price_x96, tick, observation_index, cardinality=0, cardinality_next=0, fee_protocol=0, unlocked=1):
+    """Pack slot0 the way UniswapV3Pool stores it, low bits first."""
+    word = sqrt_price_x96
+    word |= (tick & 0xffffff) << 160 # int24, two's complement
+    word |= observation_index << 184
+    word |= cardinality << 200
+    word |= cardinality_next << 216
+    word |= fee_protocol << 232
+    word |= unlocked << 240
+    return word.to_bytes(32, 'big')
+
+
+def test_decode_slot0_word_negative_tick():
+    sqrt_price_x96 = get_sqrt_ratio_at_tick(-201234)
+    raw = _slot0_word(sqrt_price_x96, -201234, 513, cardinality=720, cardinality_next=720, fee_protocol=0x44)
+    assert decode_slot0_word(raw) == (sqrt_price_x96, -201234, 513)
+
+
+def test_decode_slot0_word_positive_tick_and_short_input():
+    raw = _slot0_word(get_sqrt_ratio_at_tick(0), 0, 0, unlocked=0)
+    assert decode_slot0_word(raw) == (2**96, 0, 0)
+    # eth_getStorageAt results may come back without leading zero bytes
+    assert decode_slot0_word(raw.lstrip(b'\0')) == (2**96, 0, 0)
+    raw = _slot0_word(MAX_SQRT_RATIO - 1, MAX_TICK - 1, 0xffff)
+    assert decode_slot0_word(raw) == (MAX_SQRT_RATIO - 1, MAX_TICK - 1, 0xffff)
@@ -0,0 +1,223 @@
+import functools
+import math
+
+# numba is optional: without it the kernels below run as plain Python functions
+try:
+    from numba import njit, prange
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+    prange = range
+
+# --- Uniswap V3 tick constants ---
+MIN_TICK = -887272
+MAX_TICK = 887272
+INV_LOG_1_0001 = 1.0 / math.log(1.0001)
+
+
+@njit("int64(float64, int64, int64)", cache=True)
+def price_to_tick(price, dec0, dec1):
+    """
+    Tick for a human-readable T1/T0 price: floor(log_1.0001(price * 10**(dec0 - dec1))), clamped.
+    Same as floor(log_sqrt(1.0001)(sqrt(adjusted price))), without the sqrt. `price` must be > 0.
+    """
+    tick = math.floor(math.log(price * 10.0 ** (dec0 - dec1)) * INV_LOG_1_0001)
+    return max(MIN_TICK, min(MAX_TICK, tick))
+
+
+def ticks_from_prices(prices, dec0, dec1):
+    """
+    Vectorized price_to_tick_exact for replaying many predictions at once (backtesting).
+    Takes an array-like of T1/T0 prices and returns a NumPy masked int32 array of clamped ticks;
+    NaN, infinite, zero and negative prices have no tick and come back masked.
+    The float log is only trusted away from tick boundaries: entries within 1e-6 of one are
+    resolved with price_to_tick_exact, so every tick matches the scalar path.
+    """
+    import numpy as np # Only needed for batch replays
+
+    prices = np.asarray(prices, dtype=np.float64)
+    valid = np.isfinite(prices) & (prices > 0)
+    raw = np.zeros(prices.shape, dtype=np.float64)
+    np.log(prices * 10.0 ** (dec0 - dec1), out=raw, where=valid)
+    raw *= INV_LOG_1_0001
+    ticks = np.floor(raw)
+    for i in np.flatnonzero(valid & (np.abs(raw - np.rint(raw)) < 1e-6)):
+        ticks.flat[i] = price_to_tick_exact(float(prices.flat[i]), dec0, dec1)
+    np.clip(ticks, MIN_TICK, MAX_TICK, out=ticks)
+    return np.ma.masked_array(ticks.astype(np.int32), mask=~valid)
+
+
+@njit("int64(int64, int64)", cache=True)
+def floor_to_tick_spacing(tick, tick_spacing):
+    """Largest multiple of tick_spacing <= tick, as the managers' floorToTickSpacing (rounds toward -inf)."""
+    return (tick // tick_spacing) * tick_spacing
+
+
+@functools.lru_cache(maxsize=8)
+def tick_bounds(tick_spacing):
+    """(MIN_TICK, MAX_TICK) floored to tick_spacing; pools only use a handful of spacings (1, 10, 60, 200)."""
+    return floor_to_tick_spacing(MIN_TICK, tick_spacing), floor_to_tick_spacing(MAX_TICK, tick_spacing)
+
+
+@njit("UniTuple(int64, 2)(int64, int64, int64, int64, int64)", cache=True)
+def _calculate_ticks(center_tick, tick_spacing, range_width_multiplier, min_tick_floor, max_tick_floor):
+    half_width = (tick_spacing * range_width_multiplier) // 2
+    if half_width <= 0:
+        half_width = tick_spacing
+    half_width = (half_width // tick_spacing) * tick_spacing
+    if half_width == 0:
+        half_width = tick_spacing
+
+    raw_upper = center_tick + half_width
+    tick_lower = floor_to_tick_spacing(center_tick - half_width, tick_spacing)
+    tick_upper = floor_to_tick_spacing(raw_upper, tick_spacing)
+    if raw_upper % tick_spacing != 0:
+        tick_upper += tick_spacing
+    if tick_lower >= tick_upper:
+        tick_upper = tick_lower + tick_spacing
+
+    if tick_lower < MIN_TICK:
+        tick_lower = min_tick_floor
+    if tick_upper > MAX_TICK:
+        tick_upper = max_tick_floor
+    if tick_lower >= tick_upper:
+        tick_upper = tick_lower + tick_spacing
+        if tick_upper > MAX_TICK:
+            tick_upper = max_tick_floor
+            tick_lower = tick_upper - tick_spacing
+    return tick_lower, tick_upper
+
+
+def calculate_ticks(center_tick, tick_spacing, range_width_multiplier):
+    """(tickLower, tickUpper) around center_tick, mirroring PredictiveLiquidityManager._calculateTicks."""
+    return _calculate_ticks(center_tick, tick_spacing, range_width_multiplier, *tick_bounds(tick_spacing))
+
+
+@njit("UniTuple(int64, 2)(int64, int64, int64)", cache=True)
+def baseline_target_ticks(current_tick, tick_spacing, range_width_multiplier):
+    """
+    (tickLower, tickUpper) the baseline strategy centres on the current pool tick: a window of
+    tick_spacing * range_width_multiplier, both edges floored to the spacing, clamped to the tick range.
+    """
+    half_width = (tick_spacing * range_width_multiplier) // 2
+    if half_width < tick_spacing:
+        half_width = tick_spacing
+
+    tick_lower = floor_to_tick_spacing(current_tick - half_width, tick_spacing)
+    tick_upper = floor_to_tick_spacing(current_tick + half_width, tick_spacing)
+    if tick_lower >= tick_upper:
+        tick_upper = tick_lower + tick_spacing
+
+    tick_lower = max(MIN_TICK, tick_lower)
+    tick_upper = min(MAX_TICK, tick_upper)
+    if tick_lower >= tick_upper:
+        if tick_upper == MAX_TICK:
+            tick_lower = tick_upper - tick_spacing
+        else:
+            tick_upper = tick_lower + tick_spacing
+        tick_lower = max(MIN_TICK, tick_lower)
+    return tick_lower, tick_upper
+
+
+@njit(parallel=True, cache=True)
+def _tick_ranges_kernel(prices, dec0, dec1, tick_spacing, range_width_multiplier, min_tick_floor, max_tick_floor, out):
+    for i in prange(prices.shape[0]):
+        lower, upper = _calculate_ticks(price_to_tick(prices[i], dec0, dec1), tick_spacing, range_width_multiplier,
+                                        min_tick_floor, max_tick_floor)
+        out[i, 0] = lower
+        out[i, 1] = upper
+
+
+def tick_ranges_from_prices(prices, dec0, dec1, tick_spacing, range_width_multiplier=4):
+    """
+    Target (tickLower, tickUpper) for many candidate prices at once, for sweeps and backtests.
+    Returns an (n, 2) int64 NumPy array; rows are computed in parallel when numba is installed.
+    Uses the float price_to_tick, so a price sitting exactly on a tick boundary may land one tick low.
+    """
+    import numpy as np # Only needed for batch evaluation
+
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    out = np.empty((prices.shape[0], 2), dtype=np.int64)
+    _tick_ranges_kernel(prices, dec0, dec1, tick_spacing, range_width_multiplier, *tick_bounds(tick_spacing), out)
+    return out
+
+
+# --- Exact integer port of Uniswap V3 TickMath (pure Python ints, no float overflow) ---
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+# Q128 multipliers for sqrt(1.0001)^-(2^i), i = 0..19, from TickMath.getSqrtRatioAtTick
+_SQRT_RATIO_FACTORS = (
+    (0x2, 0xfff97272373d413259a46990580e213a), (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0), (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0), (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053), (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54), (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9), (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5), (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6), (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604), (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+def get_sqrt_ratio_at_tick(tick):
+    """sqrtPriceX96 at a tick, bit-for-bit identical to TickMath.getSqrtRatioAtTick."""
+    abs_tick = -tick if tick < 0 else tick
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 1 << 128
+    for bit, factor in _SQRT_RATIO_FACTORS:
+        if abs_tick & bit:
+            ratio = (ratio * factor) >> 128
+    if tick > 0:
+        ratio = ((1 << 256) - 1) // ratio
+    # Q128.128 -> Q64.96, rounding up
+    return (ratio >> 32) + (1 if ratio & 0xffffffff else 0)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96):
+    """
+    Greatest tick whose sqrt ratio is <= sqrtPriceX96, as TickMath.getTickAtSqrtRatio computes it:
+    MSB scan, 14 rounds of fixed-point log2 squaring, then a choice between the two candidate ticks.
+    """
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"sqrtPriceX96 {sqrt_price_x96} out of range")
+    ratio = sqrt_price_x96 << 32
+    msb = ratio.bit_length() - 1
+    r = ratio >> (msb - 127) if msb >= 128 else ratio << (127 - msb)
+
+    log_2 = (msb - 128) << 64
+    for shift in range(63, 49, -1):
+        r = (r * r) >> 127
+        f = r >> 128
+        log_2 |= f << shift
+        r >>= f
+
+    log_sqrt10001 = log_2 * 255738958999603826347141 # 128.128 number
+    tick_low = (log_sqrt10001 - 3402992956809132418596140100660247210) >> 128
+    tick_hi = (log_sqrt10001 + 291339464771989622907027621153398088495) >> 128
+    if tick_low == tick_hi:
+        return tick_low
+    return tick_hi if get_sqrt_ratio_at_tick(tick_hi) <= sqrt_price_x96 else tick_low
+
+
+def price_to_tick_exact(price, dec0, dec1):
+    """
+    Exact counterpart of price_to_tick: the float price is taken as the binary rational it is,
+    converted to an integer sqrtPriceX96 with isqrt, and resolved with get_tick_at_sqrt_ratio,
+    so the result matches on-chain TickMath even on tick boundaries. Clamped like price_to_tick.
+    """
+    num, den = float(price).as_integer_ratio()
+    if dec0 >= dec1:
+        num *= 10 ** (dec0 - dec1)
+    else:
+        den *= 10 ** (dec1 - dec0)
+    sqrt_price_x96 = math.isqrt((num << 192) // den)
+    if sqrt_price_x96 < MIN_SQRT_RATIO:
+        return MIN_TICK
+    if sqrt_price_x96 >= MAX_SQRT_RATIO:
+        return MAX_TICK
+    return get_tick_at_sqrt_ratio(sqrt_price_x96)
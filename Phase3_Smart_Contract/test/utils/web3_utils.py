@@ -1,11 +1,32 @@
 import os
 import json
 import logging
+import functools
+import pickle
 from web3 import Web3
+from web3.contract import Contract
+from web3.exceptions import TimeExhausted, TransactionNotFound, Web3Exception
+from web3.types import TxReceipt
 from eth_account import Account
-from dotenv import load_dotenv
+from eth_utils import event_abi_to_log_topic
 from pathlib import Path
 import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Hardhat artifacts carry the full bytecode, so a fast parser pays off: orjson, then ujson, then stdlib json.
+# json_dumps always returns bytes (orjson's contract), ready for write_bytes.
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
 # --- Logging Setup ---
 logger = logging.getLogger('web3_utils')
@@ -13,26 +34,81 @@ if not logger.hasHandlers():
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 # --- Load Environment Variables ---
+def _load_env(path: Path) -> None:
+    """Minimal .env reader: KEY=VALUE lines, '#' comments, optional quotes/export; never overrides the environment."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            key, sep, value = line.removeprefix('export ').partition('=')
+            key, value = key.strip(), value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                value = value[1:-1]
+            if sep and key and key not in os.environ:
+                os.environ[key] = value
+
 utils_dir = Path(__file__).resolve().parent
 PROJECT_ROOT = utils_dir.parent.parent  # Should resolve to Phase3_Smart_Contract
 env_path = PROJECT_ROOT / '.env'
 if env_path.exists():
-    load_dotenv(dotenv_path=env_path)
+    _load_env(env_path)
     # logger.debug(f"Loaded .env file from: {env_path}")
 else:
-    logger.warning(f".env file not found at expected location: {env_path}")
+    logger.warning(".env file not found at expected location: %s", env_path)
 
 PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 RPC_URL = os.getenv('MAINNET_FORK_RPC_URL', 'http://127.0.0.1:8545')
 
+def env_number(name: str, default, cast=int):
+    """Numeric env var parsed with cast; unset/blank gives default, a malformed value warns and gives default."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        logger.warning("Ignoring %s=%r: not a valid %s; using default %s.", name, raw, cast.__name__, default)
+        return default
+
 # --- Web3 Initialization ---
-w3 = None
+w3: Web3 | None = None
+CHAIN_ID: int | None = None # Resolved once per connection; a fork never changes chain id
+# Receipt polling: first probe right away (automining forks include the tx on send), then back off
+RECEIPT_POLL_START_S = 0.5
+RECEIPT_POLL_MAX_S = 8.0
+# Fee params move at most once per block, so reuse them for a few seconds across back-to-back txs
+FEE_PARAMS_TTL_S = 6.0
+_fee_params_cache: tuple[float, dict | None] = (0.0, None) # (monotonic fetch time, fee fields)
+_contract_cache: dict[tuple[str, str], Contract] = {} # (address as given or checksummed, contract name) -> Contract bound to the current w3
+
+def build_http_session() -> requests.Session:
+    """
+    Keep-alive requests.Session with a pooled, retrying adapter. Shared setup for the Web3 provider,
+    the LSTM API client and the wallet funder, so every HTTP caller reuses its connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                          max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504)))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+_rpc_session = build_http_session()
+
+class _FastJsonHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider whose JSON-RPC responses (single and batch) are parsed with json_loads (orjson when available)."""
+
+    @staticmethod
+    def decode_rpc_response(raw_response: bytes):
+        return json_loads(raw_response)
 
-def init_web3(retries=3, delay=2):
+def init_web3(retries: int = 3, delay: float = 2) -> bool:
     """Initialize Web3 connection and validate environment."""
-    global w3
-    if w3 and w3.is_connected():
-        # logger.debug("Web3 already initialized and connected.")
+    global w3, CHAIN_ID
+    if w3 is not None:
+        # Connectivity was verified when w3 was built (w3 is reset to None on failure);
+        # later callers skip the extra web3_clientVersion round-trip
         return True
 
     if not RPC_URL:
@@ -42,25 +118,38 @@ def init_web3(retries=3, delay=2):
 
     for attempt in range(retries):
         try:
-            logger.info(f"Attempting to connect to Web3 provider at {RPC_URL} (Attempt {attempt + 1}/{retries})...")
-            w3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs={'timeout': 60}))
+            logger.info("Attempting to connect to Web3 provider at %s (Attempt %s/%s)...", RPC_URL, attempt + 1, retries)
+            w3 = Web3(_FastJsonHTTPProvider(RPC_URL, request_kwargs={'timeout': 60}, session=_rpc_session))
+            _contract_cache.clear() # Cached instances are bound to the previous provider
             if w3.is_connected():
-                chain_id = w3.net.version
-                logger.info(f"Successfully connected to network via {RPC_URL} - Chain ID: {chain_id}")
+                CHAIN_ID = w3.eth.chain_id
+                logger.info("Successfully connected to network via %s - Chain ID: %s", RPC_URL, CHAIN_ID)
                 return True
             else:
-                logger.warning(f"Connection attempt {attempt + 1} failed (is_connected() is false).")
+                logger.warning("Connection attempt %s failed (is_connected() is false).", attempt + 1)
         except Exception as e:
-            logger.error(f"Error connecting to Web3 provider on attempt {attempt + 1}: {e}")
+            logger.error("Error connecting to Web3 provider on attempt %s: %s", attempt + 1, e)
 
         if attempt < retries - 1:
-            logger.info(f"Retrying connection after {delay} seconds...")
+            logger.info("Retrying connection after %s seconds...", delay)
             time.sleep(delay)
 
     logger.critical("Failed to connect to Web3 provider after multiple retries.")
     w3 = None # Ensure w3 is None if all retries fail
+    CHAIN_ID = None
     return False
 
+def get_chain_id() -> int:
+    """Chain ID of the connected network, fetched over RPC only the first time."""
+    global CHAIN_ID
+    if CHAIN_ID is None:
+        if not w3:
+            if not init_web3():
+                raise ConnectionError("Web3 connection failed or could not be established in get_chain_id.")
+        if CHAIN_ID is None:
+            CHAIN_ID = w3.eth.chain_id
+    return CHAIN_ID
+
 # --- Standard IERC20 ABI ---
 IERC20_ABI = [
     {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function", "stateMutability": "view"},
@@ -80,59 +169,227 @@ WETH_ABI = IERC20_ABI + [
 
 
 # --- Mainnet WETH Address ---
-WETH_ADDRESS = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WETH_ADDRESS = Web3.to_checksum_address("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2") # Checksummed once at import
+
+_UNUSED_ABI_TYPES = frozenset(('constructor', 'fallback', 'receive'))
+# Filtered ABIs are pickled here so later runs skip the artifact JSON (bytecode included) entirely
+ABI_CACHE_DIR = PROJECT_ROOT / '.test_cache' / 'abi'
+
+def _read_abi_cache(cache_path: Path, artifact_path: Path) -> list[dict] | None:
+    """Pickled ABI if it is at least as new as its artifact, else None."""
+    try:
+        if cache_path.stat().st_mtime >= artifact_path.stat().st_mtime:
+            return pickle.loads(cache_path.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    return None
 
-def load_contract_abi(contract_name):
-    """Load a contract ABI from artifacts directory."""
+def _write_abi_cache(cache_path: Path, abi: list[dict]) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(pickle.dumps(abi, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError as e:
+        logger.warning("Could not write ABI cache %s: %s", cache_path, e)
+
+# Artifact directories searched for ABIs, in order of precedence (relative to PROJECT_ROOT)
+ARTIFACT_DIRS = (
+    'artifacts/contracts',
+    'artifacts/contracts/interfaces',
+    'artifacts/@uniswap/v3-core/contracts/interfaces',
+    'artifacts/@uniswap/v3-periphery/contracts/interfaces',
+    # Add other artifact directories if your project structure is different
+)
+
+@functools.lru_cache(maxsize=None)
+def artifact_paths() -> dict[str, Path]:
+    """Contract name -> artifact JSON (<dir>/<Name>.sol/<Name>.json), from one directory scan per run."""
+    paths = {}
+    for artifact_dir in ARTIFACT_DIRS:
+        for path in sorted((PROJECT_ROOT / artifact_dir).glob('*.sol/*.json')):
+            if path.parent.name == f'{path.stem}.sol': # Skips *.dbg.json and secondary contracts of a file
+                paths.setdefault(path.stem, path)
+    return paths
+
+@functools.lru_cache(maxsize=None)
+def load_contract_abi(contract_name: str) -> list[dict]:
+    """Load a contract ABI from artifacts directory (read from disk once per name)."""
     if contract_name == "IERC20": return IERC20_ABI
     if contract_name == "WETH": return WETH_ABI
 
-    base_path = PROJECT_ROOT # Assumes artifacts is in PROJECT_ROOT
-
-    possible_paths = [
-        base_path / f'artifacts/contracts/{contract_name}.sol/{contract_name}.json',
-        base_path / f'artifacts/contracts/interfaces/{contract_name}.sol/{contract_name}.json',
-        base_path / f'artifacts/@uniswap/v3-core/contracts/interfaces/{contract_name}.sol/{contract_name}.json',
-        base_path / f'artifacts/@uniswap/v3-periphery/contracts/interfaces/{contract_name}.sol/{contract_name}.json',
-        # Add other potential paths if your project structure is different
-    ]
-
-    for path in possible_paths:
-        if path.exists():
-            # logger.debug(f"Loading ABI for {contract_name} from: {path}")
-            with open(path) as f:
-                try:
-                    contract_json = json.load(f)
-                    if 'abi' not in contract_json:
-                        logger.error(f"ABI key not found in {path}")
-                        continue
-                    return contract_json['abi']
-                except json.JSONDecodeError:
-                    logger.error(f"Error decoding JSON from {path}")
-                    continue
-    raise FileNotFoundError(f"ABI not found for {contract_name} in any expected path relative to {base_path}. Searched paths: {possible_paths}")
-
-def get_contract(address, contract_name):
+    path = artifact_paths().get(contract_name)
+    if path is None:
+        raise FileNotFoundError(f"ABI not found for {contract_name} in any of {ARTIFACT_DIRS} under {PROJECT_ROOT}")
+
+    cache_path = ABI_CACHE_DIR / f'{contract_name}.abi.pickle'
+    abi = _read_abi_cache(cache_path, path)
+    if abi is not None:
+        return abi
+    # logger.debug(f"Loading ABI for {contract_name} from: {path}")
+    try:
+        contract_json = json_loads(path.read_bytes())
+    except ValueError as e: # JSONDecodeError of whichever parser is in use
+        logger.error("Error decoding JSON from %s", path)
+        raise FileNotFoundError(f"Unreadable artifact for {contract_name}: {path}") from e
+    if 'abi' not in contract_json:
+        logger.error("ABI key not found in %s", path)
+        raise FileNotFoundError(f"No ABI in artifact for {contract_name}: {path}")
+    # Only functions, events and custom errors are used; the rest is dead weight on every Contract
+    abi = [entry for entry in contract_json['abi'] if entry.get('type') not in _UNUSED_ABI_TYPES]
+    _write_abi_cache(cache_path, abi)
+    return abi
+
+@functools.lru_cache(maxsize=None)
+def event_topics(contract_name: str) -> dict[bytes, dict]:
+    """
+    topic0 (raw 32 bytes) -> event ABI for every non-anonymous event of a contract, hashed once per contract.
+    Log topics are HexBytes, a bytes subclass, so they can be looked up directly without hex conversion.
+    """
+    return {
+        event_abi_to_log_topic(entry): entry
+        for entry in load_contract_abi(contract_name)
+        if entry.get('type') == 'event' and not entry.get('anonymous')
+    }
+
+@functools.lru_cache(maxsize=None)
+def bloom_mask(*items: bytes) -> int:
+    """logsBloom bits (3 per item, from its keccak) that must all be set if every item appears in a receipt's logs."""
+    mask = 0
+    for item in items:
+        digest = Web3.keccak(item)
+        for i in (0, 2, 4):
+            mask |= 1 << (((digest[i] << 8) | digest[i + 1]) & 2047)
+    return mask
+
+def bloom_may_contain(logs_bloom: bytes, mask: int) -> bool:
+    """False means definitely absent; True may be a false positive, so the logs still need checking."""
+    return int.from_bytes(logs_bloom, 'big') & mask == mask
+
+def get_contract(address: str, contract_name: str) -> Contract:
     """Get contract instance with loaded ABI."""
     global w3
-    if not w3 or not w3.is_connected():
+    if not w3:
         if not init_web3(): # Attempt to initialize if not already
             raise ConnectionError("Web3 connection failed or could not be established in get_contract.")
 
     if not address: raise ValueError(f"Address for {contract_name} not provided")
 
     try:
-        checksum_address = Web3.to_checksum_address(address)
-        abi = load_contract_abi(contract_name)
-        return w3.eth.contract(address=checksum_address, abi=abi)
+        # Hits on the address as passed skip the keccak checksum; misses also index the checksummed form
+        contract = _contract_cache.get((address, contract_name))
+        if contract is None:
+            checksum_address = Web3.to_checksum_address(address)
+            contract = _contract_cache.get((checksum_address, contract_name))
+            if contract is None:
+                abi = load_contract_abi(contract_name)
+                contract = w3.eth.contract(address=checksum_address, abi=abi)
+                _contract_cache[(checksum_address, contract_name)] = contract
+            _contract_cache[(address, contract_name)] = contract
+        return contract
     except Exception as e:
-        logger.exception(f"Error getting contract {contract_name} at {address}: {e}")
+        logger.exception("Error getting contract %s at %s: %s", contract_name, address, e)
         raise
 
-def send_transaction(tx_params_dict): # Renamed to avoid conflict if tx_params is a function argument elsewhere
+# Uniswap V3 pools are CREATE2-deployed and never move, so getPool results are kept across runs
+POOL_ADDRESS_CACHE_FILE = PROJECT_ROOT / '.test_cache' / 'pool_addresses.json'
+_pool_address_cache: dict[str, str] | None = None # 'chainId:factory:tokenA:tokenB:fee' -> pool address
+
+def get_pool_address(factory_address: str, token_a: str, token_b: str, fee: int) -> str | None:
+    """Pool for a token pair and fee tier via factory.getPool, remembered per chain; None if no pool exists."""
+    global _pool_address_cache
+    if _pool_address_cache is None:
+        try:
+            _pool_address_cache = json_loads(POOL_ADDRESS_CACHE_FILE.read_bytes())
+        except (OSError, ValueError):
+            _pool_address_cache = {}
+    token_a, token_b = sorted((Web3.to_checksum_address(token_a), Web3.to_checksum_address(token_b)), key=str.lower)
+    key = f"{get_chain_id()}:{Web3.to_checksum_address(factory_address)}:{token_a}:{token_b}:{fee}"
+    pool_address = _pool_address_cache.get(key)
+    if pool_address:
+        return pool_address
+
+    pool_address = get_contract(factory_address, "IUniswapV3Factory").functions.getPool(token_a, token_b, fee).call()
+    if not pool_address or int(pool_address, 16) == 0:
+        return None # Not cached: the pool may still be created later
+    _pool_address_cache[key] = pool_address
+    try:
+        POOL_ADDRESS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        POOL_ADDRESS_CACHE_FILE.write_bytes(json_dumps(_pool_address_cache))
+    except OSError as e:
+        logger.warning("Could not write pool address cache %s: %s", POOL_ADDRESS_CACHE_FILE, e)
+    return pool_address
+
+# --- Learned Gas Caps ---
+# Adjustment txs are sent with a limit derived from the highest gasUsed seen so far (kept in a
+# small JSON file per test) instead of an eth_estimateGas round-trip per transaction
+def load_learned_gas(path: Path) -> int | None:
+    """Highest gasUsed recorded in `path` for a successful adjustment, or None before the first one."""
+    try:
+        return json_loads(path.read_bytes()).get('adjust_gas_used')
+    except (OSError, ValueError):
+        return None
+
+def store_learned_gas(path: Path, gas_used: int | None) -> None:
+    """Record (or with None, forget) the learned adjustment gasUsed."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(json_dumps({'adjust_gas_used': gas_used}))
+    except OSError as e:
+        logger.warning("Could not write gas cap file %s: %s", path, e)
+
+def format_token_amount(amount: int, decimals: int = 18) -> str:
+    """Exact decimal string for an integer token amount (wei -> ETH by default), using only int ops."""
+    sign = '-' if amount < 0 else ''
+    whole, frac = divmod(abs(amount), 10 ** decimals)
+    if not frac:
+        return f"{sign}{whole}"
+    return f"{sign}{whole}.{frac:0{decimals}d}".rstrip('0')
+
+def get_fee_params() -> dict:
+    """
+    Fee fields for a new transaction: EIP-1559 maxFeePerGas/maxPriorityFeePerGas from the
+    latest block's fee history, or a legacy gasPrice if the node has no fee history.
+    maxFeePerGas leaves 2x base fee headroom, so the result stays valid for a few blocks.
+    Cached for FEE_PARAMS_TTL_S; returns a fresh dict each call.
+    """
+    global _fee_params_cache
+    fetched_at, fee_params = _fee_params_cache
+    if fee_params is not None and time.monotonic() - fetched_at < FEE_PARAMS_TTL_S:
+        return dict(fee_params)
+    try:
+        fee_history = w3.eth.fee_history(1, 'latest', [10])
+        base_fee = fee_history['baseFeePerGas'][-1]
+        tip = fee_history['reward'][-1][0] if fee_history['reward'] and fee_history['reward'][-1] else w3.to_wei(1, 'gwei') # Fallback tip
+        # logger.debug(f"Using EIP-1559 gas: maxFeePerGas={base_fee * 2 + tip}, maxPriorityFeePerGas={tip}")
+        fee_params = {'maxPriorityFeePerGas': tip, 'maxFeePerGas': base_fee * 2 + tip}
+    except (Web3Exception, KeyError, IndexError, ValueError):
+        # No fee history (pre-London node or method unsupported): fall back to legacy gasPrice
+        fee_params = {'gasPrice': int(w3.eth.gas_price * 1.1)}
+    _fee_params_cache = (time.monotonic(), fee_params)
+    return dict(fee_params)
+
+def wait_for_receipt(tx_hash, timeout: float = 180) -> TxReceipt:
+    """
+    Poll eth_getTransactionReceipt until the tx is mined, backing off from RECEIPT_POLL_START_S
+    to RECEIPT_POLL_MAX_S between probes instead of web3's fixed 0.1 s loop.
+    Raises TimeExhausted after `timeout` seconds, like wait_for_transaction_receipt.
+    """
+    deadline = time.monotonic() + timeout
+    delay = RECEIPT_POLL_START_S
+    while True:
+        try:
+            return w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeExhausted(f"Transaction {Web3.to_hex(tx_hash)} not mined after {timeout} seconds")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, RECEIPT_POLL_MAX_S)
+
+def send_transaction(tx_params_dict: dict) -> TxReceipt | None: # Renamed to avoid conflict if tx_params is a function argument elsewhere
     """Builds necessary fields, signs, sends a transaction and waits for receipt."""
     global w3
-    if not w3 or not w3.is_connected():
+    if not w3:
         if not init_web3():
             raise ConnectionError("Web3 connection failed or could not be established in send_transaction.")
 
@@ -143,7 +400,7 @@ def send_transaction(tx_params_dict): # Renamed to avoid conflict if tx_params i
 
     try:
         # Ensure Chain ID
-        if 'chainId' not in tx_params_dict: tx_params_dict['chainId'] = int(w3.net.version)
+        if 'chainId' not in tx_params_dict: tx_params_dict['chainId'] = get_chain_id()
 
         # Ensure Nonce
         if 'nonce' not in tx_params_dict: tx_params_dict['nonce'] = w3.eth.get_transaction_count(tx_params_dict['from'])
@@ -154,21 +411,12 @@ def send_transaction(tx_params_dict): # Renamed to avoid conflict if tx_params i
                 tx_params_dict['gas'] = int(w3.eth.estimate_gas(tx_params_dict) * 1.25) # Add 25% buffer
                 # logger.debug(f"Estimated gas: {tx_params_dict['gas']}")
             except Exception as gas_err:
-                logger.error(f"Gas estimation failed: {gas_err}. Using default 1,000,000.")
+                logger.error("Gas estimation failed: %s. Using default 1,000,000.", gas_err)
                 tx_params_dict['gas'] = 1000000
 
         # Gas Price Strategy (Handle EIP-1559 vs Legacy)
         if 'gasPrice' not in tx_params_dict and 'maxFeePerGas' not in tx_params_dict:
-            try:
-                fee_history = w3.eth.fee_history(1, 'latest', [10])
-                base_fee = fee_history['baseFeePerGas'][-1]
-                tip = fee_history['reward'][-1][0] if fee_history['reward'] and fee_history['reward'][-1] else w3.to_wei(1, 'gwei') # Fallback tip
-                tx_params_dict['maxPriorityFeePerGas'] = tip
-                tx_params_dict['maxFeePerGas'] = base_fee * 2 + tip
-                # logger.debug(f"Using EIP-1559 gas: maxFeePerGas={tx_params_dict['maxFeePerGas']}, maxPriorityFeePerGas={tx_params_dict['maxPriorityFeePerGas']}")
-            except:
-                tx_params_dict['gasPrice'] = int(w3.eth.gas_price * 1.1)
-                # logger.debug(f"Using legacy gasPrice: {tx_params_dict['gasPrice']}")
+            tx_params_dict.update(get_fee_params())
         # elif 'gasPrice' in tx_params_dict:
             # logger.debug(f"Using provided legacy gasPrice: {tx_params_dict['gasPrice']}")
         # elif 'maxFeePerGas' in tx_params_dict:
@@ -177,20 +425,21 @@ def send_transaction(tx_params_dict): # Renamed to avoid conflict if tx_params i
         # logger.debug(f"Final TX params before signing: {tx_params_dict}")
         signed_tx = w3.eth.account.sign_transaction(tx_params_dict, PRIVATE_KEY)
         tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        logger.info(f"Transaction sent: {tx_hash.hex()}")
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180)
-        logger.info(f"Transaction confirmed in block: {receipt.blockNumber}, Status: {receipt.status}")
+        logger.info("Transaction sent: %s", tx_hash.hex())
+        receipt = wait_for_receipt(tx_hash)
+        logger.info("Transaction confirmed in block: %s, Status: %s", receipt.blockNumber, receipt.status)
         return receipt
     except Exception as e:
-        logger.exception(f"Transaction processing failed: {e}")
+        logger.exception("Transaction processing failed: %s", e)
         return None
 
-def wrap_eth_to_weth(amount_wei) -> bool:
+def wrap_eth_to_weth(amount_wei: int, nonce: int | None = None) -> bool:
     """
     Wrap ETH to WETH by sending ETH to the WETH contract address.
+    Callers that track the deployer nonce locally pass it in; otherwise it is read from the node (pending).
     """
     global w3
-    if not w3 or not w3.is_connected():
+    if not w3:
         if not init_web3():
              raise ConnectionError("Web3 connection failed or could not be established in wrap_eth_to_weth.")
 
@@ -200,42 +449,54 @@ def wrap_eth_to_weth(amount_wei) -> bool:
 
     try:
         account = Account.from_key(PRIVATE_KEY)
-        checksum_weth_address = Web3.to_checksum_address(WETH_ADDRESS)
+        checksum_weth_address = WETH_ADDRESS
 
-        logger.info(f"Attempting to wrap {Web3.from_wei(amount_wei, 'ether')} ETH for {account.address} by sending to {checksum_weth_address}")
+        logger.info("Attempting to wrap %s ETH for %s by sending to %s", format_token_amount(amount_wei), account.address, checksum_weth_address)
 
         tx_dict = {
             'from': account.address,
             'to': checksum_weth_address,
             'value': amount_wei,
-            'nonce': w3.eth.get_transaction_count(account.address),
-            'chainId': int(w3.net.version),
+            'chainId': get_chain_id(),
         }
 
+        if nonce is not None:
+            eth_balance = w3.eth.get_balance(account.address)
+        else:
+            # Nonce and ETH balance in one JSON-RPC batch; estimate_gas stays out so a revert can't sink the batch
+            try:
+                with w3.batch_requests() as batch:
+                    batch.add(w3.eth.get_transaction_count(account.address, 'pending'))
+                    batch.add(w3.eth.get_balance(account.address))
+                    nonce, eth_balance = batch.execute()
+            except Exception as e:
+                logger.warning("Batched nonce/balance read failed (%s); reading them one by one.", e)
+                nonce = w3.eth.get_transaction_count(account.address, 'pending')
+                eth_balance = w3.eth.get_balance(account.address)
+
+        if eth_balance < amount_wei:
+            logger.error("Insufficient ETH to wrap: have %s, need %s.", format_token_amount(eth_balance), format_token_amount(amount_wei))
+            return False
+        tx_dict['nonce'] = nonce
+
+        gas_estimate = None
         try:
-            tx_dict['gas'] = int(w3.eth.estimate_gas(tx_dict) * 1.25)
+            gas_estimate = w3.eth.estimate_gas(tx_dict)
         except Exception as e:
-            logger.warning(f"Gas estimation for wrap_eth_to_weth failed: {e}. Using default gas limit 100000.")
-            tx_dict['gas'] = 100000 # WETH deposit is usually low gas
+            logger.warning("Gas estimation for wrap_eth_to_weth failed: %s. Using default gas limit 100000.", e)
+        tx_dict['gas'] = int(gas_estimate * 1.25) if gas_estimate is not None else 100000 # WETH deposit is usually low gas
 
         # Set gas price (EIP-1559 preferred)
-        try:
-            fee_history = w3.eth.fee_history(1, 'latest', [10])
-            base_fee = fee_history['baseFeePerGas'][-1]
-            tip = fee_history['reward'][-1][0] if fee_history['reward'] and fee_history['reward'][-1] else w3.to_wei(1, 'gwei')
-            tx_dict['maxPriorityFeePerGas'] = tip
-            tx_dict['maxFeePerGas'] = base_fee * 2 + tip
-        except:
-            tx_dict['gasPrice'] = int(w3.eth.gas_price * 1.1)
+        tx_dict.update(get_fee_params())
 
         receipt = send_transaction(tx_dict) # Use the main send_transaction helper
 
         if receipt and receipt.status == 1:
-            logger.info(f"WETH wrap confirmed successfully.")
+            logger.info("WETH wrap confirmed successfully.")
             return True
         else:
-            logger.error(f"WETH wrap transaction failed or receipt not obtained. Receipt: {receipt}")
+            logger.error("WETH wrap transaction failed or receipt not obtained. Receipt: %s", receipt)
             return False
     except Exception as e:
-        logger.exception(f"Wrapping ETH to WETH failed: {e}")
+        logger.exception("Wrapping ETH to WETH failed: %s", e)
         return False
\ No newline at end of file